@@ -1,23 +1,68 @@
-from core.processor import  XBRLProcessor
+from core.processor import  XBRLProcessor, _PARSER_OPTIONS, _LINKBASE_PARSER_OPTIONS
 from core.models import XBRLFile
 from core.inline_processor import iXBRLProcessor
 from lxml import etree
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
+from enum import IntFlag
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class FileType(IntFlag):
+    """Bit for each file_type string _determine_file_type can return."""
+    INSTANCE = 1
+    IXBRL = 2
+    SCHEMA = 4
+    CALCULATION = 8
+    PRESENTATION = 16
+    LABEL = 32
+    REFERENCE = 64
+    LINKBASE = 128
+
+
+def _parse_supporting_file(xbrl_file: XBRLFile) -> Optional[etree._ElementTree]:
+    """Parse a schema or calculation file on a worker thread.
+
+    Each call gets its own parser, as lxml parsers must not be shared between
+    threads. Failures return None; the loader then parses the file again
+    itself and reports the error as usual.
+    """
+    options = _LINKBASE_PARSER_OPTIONS if xbrl_file.file_type == 'calculation' else _PARSER_OPTIONS
+    try:
+        return etree.parse(str(xbrl_file.path), parser=etree.XMLParser(**options))
+    except Exception:
+        return None
 
 
 class XBRLFolderProcessor:
     def __init__(self):
         self.base_processor = XBRLProcessor()  # Default to standard processor
         self.discovered_files = {}
+        self.discovered_type_mask = FileType(0)  # Union of the discovered file types
         self._namespace_patterns = {}
 
+    def reset(self) -> None:
+        """Forget discovered files and loaded data, so the processor can be reused."""
+        self.discovered_files.clear()
+        self.discovered_type_mask = FileType(0)
+        self._namespace_patterns.clear()
+        # process_folder may have swapped in an iXBRLProcessor
+        if type(self.base_processor) is XBRLProcessor:
+            self.base_processor.reset()
+        else:
+            self.base_processor = XBRLProcessor()
+
     def _analyze_xml_file(self, file_path: Path) -> Optional[XBRLFile]:
         """Analyze XML file structure to determine its type based on content."""
         try:
             # Add more detailed error handling and debugging
-            print(f"Debug: Reading file {file_path}")
-            parser = etree.XMLParser(recover=True)  # More lenient parsing
+            logger.debug("Reading file %s", file_path)
+            parser = etree.XMLParser(recover=True, **_PARSER_OPTIONS)  # More lenient parsing
             tree = etree.parse(str(file_path), parser=parser)
             root = tree.getroot()
 
@@ -66,17 +111,17 @@ class XBRLFolderProcessor:
         ns_values = set(namespaces.values())
 
         # Debug namespace information
-        print(f"Debug: Root tag: {root_tag}")
-        print(f"Debug: Namespaces: {namespaces}")
+        logger.debug("Root tag: %s", root_tag)
+        logger.debug("Namespaces: %s", namespaces)
 
         # Check for iXBRL by looking for specific namespaces
         if 'http://www.xbrl.org/2013/inlineXBRL' in ns_values:
-            print("Debug: Found iXBRL namespace")
+            logger.debug("Found iXBRL namespace")
             return 'ixbrl'
 
         # Check for iXBRL based on root element
         if root_tag.lower() == 'html' and any('inline' in ns.lower() for ns in ns_values):
-            print("Debug: Found iXBRL based on HTML root and inline namespace")
+            logger.debug("Found iXBRL based on HTML root and inline namespace")
             return 'ixbrl'
 
         # Existing detection logic...
@@ -123,77 +168,114 @@ class XBRLFolderProcessor:
 
         return 'linkbase'
 
-    def _discover_files(self, folder_path: Path) -> None:
+    def _discover_files(self, folder_path: Path, executor: Optional[Executor] = None) -> None:
         """Discover and analyze all XML files in the folder."""
+        self._analyze_files(self._list_xml_files(folder_path), executor)
+
+    def _list_xml_files(self, folder_path: Path) -> List[Path]:
+        """List the folder's .xml, .xsd and .htm files, in that order."""
+        # One directory listing, grouped by extension in the order .xml, .xsd,
+        # .htm; DirEntry.is_file reuses the type the listing already returned
+        files_by_suffix = {'.xml': [], '.xsd': [], '.htm': []}
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                bucket = files_by_suffix.get(entry.name[-4:])
+                if bucket is not None and entry.is_file():
+                    bucket.append(Path(entry.path))
+        return [file_path for bucket in files_by_suffix.values() for file_path in bucket]
+
+    def _analyze_files(self, xml_files: List[Path], executor: Optional[Executor] = None) -> None:
+        """Analyze the listed files and record the XBRL ones in discovered_files.
+
+        Files are analyzed on executor when one is given and there is more
+        than one file, otherwise in turn.
+        """
         self.discovered_files.clear()
+        self.discovered_type_mask = FileType(0)
 
-        # Update file patterns to include .htm files
-        xml_files = list(folder_path.glob('*.xml')) + \
-                   list(folder_path.glob('*.xsd')) + \
-                   list(folder_path.glob('*.htm'))  # Add .htm files
-
-        # First pass: collect namespace patterns
-        for file_path in xml_files:
-            if file_path.is_file():
-                print(f"\nDebug: Analyzing {file_path.name}")
-                xbrl_file = self._analyze_xml_file(file_path)
-                if xbrl_file:
-                    self.discovered_files[file_path.name] = xbrl_file
-
-        print("\nDebug: File analysis results:")
-        for name, file in self.discovered_files.items():
-            ns_names = [f"{k} -> {v.split('/')[-1]}"
-                        for k, v in file.namespaces.items()]
-            print(f"  {name}:")
-            print(f"    Type: {file.file_type}")
-            print(f"    Root: {file.root_element}")
-            print(f"    Namespaces: {', '.join(ns_names)}")
-            if file.role_refs:
-                print(f"    Roles: {', '.join(file.role_refs.keys())}")
+        # First pass: collect namespace patterns. Each file is parsed on its
+        # own, and lxml releases the GIL while parsing, so the files can be
+        # spread over the executor; results stay in discovery order
+        if executor is None or len(xml_files) < 2:
+            results = [self._analyze_xml_file(file_path) for file_path in xml_files]
+        else:
+            results = list(executor.map(self._analyze_xml_file, xml_files))
+
+        for file_path, xbrl_file in zip(xml_files, results):
+            if xbrl_file:
+                self.discovered_files[file_path.name] = xbrl_file
+                self.discovered_type_mask |= FileType[xbrl_file.file_type.upper()]
+
+        # The summary joins every namespace of every file, so only build it
+        # when someone is listening
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("File analysis results:")
+            for name, file in self.discovered_files.items():
+                ns_names = [f"{k} -> {v.split('/')[-1]}"
+                            for k, v in file.namespaces.items()]
+                logger.debug("  %s: type=%s root=%s", name, file.file_type, file.root_element)
+                logger.debug("    Namespaces: %s", ', '.join(ns_names))
+                if file.role_refs:
+                    logger.debug("    Roles: %s", ', '.join(file.role_refs.keys()))
 
     def process_folder(self, folder_path: Path) -> None:
         """Process all XBRL files in a folder structure."""
         if not folder_path.is_dir():
             raise ValueError(f"Path {folder_path} is not a directory")
 
-        self._discover_files(folder_path)
-
-        # Find instance or iXBRL documents
-        instance_files = [f for f in self.discovered_files.values()
-                          if f.file_type in ('instance', 'ixbrl')]
-
-        if not instance_files:
-            raise ValueError(f"No XBRL or iXBRL instance document found in {folder_path}")
-
-        # Process main instance document first
-        main_instance = instance_files[0]
-        print(f"\nDebug: Loading main instance: {main_instance.path}")
-
-        # Create appropriate processor based on file type
-        if main_instance.file_type == 'ixbrl':
-            self.base_processor = iXBRLProcessor()
-            self.base_processor.load_ixbrl_instance(main_instance.path)
-        else:
-            self.base_processor = XBRLProcessor()
-            self.base_processor.load_instance(main_instance.path)
+        # One thread pool serves both file discovery and supporting file
+        # parsing. A folder with a single file has nothing to overlap, since
+        # that file can only be the instance, so it is handled inline
+        xml_files = self._list_xml_files(folder_path)
+        with (ThreadPoolExecutor(max_workers=os.cpu_count() or 1) if len(xml_files) > 1
+              else nullcontext()) as executor:
+            self._analyze_files(xml_files, executor)
+
+            # Find instance or iXBRL documents
+            instance_files = [f for f in self.discovered_files.values()
+                              if f.file_type in ('instance', 'ixbrl')]
+
+            if not instance_files:
+                raise ValueError(f"No XBRL or iXBRL instance document found in {folder_path}")
+
+            schema_files = [f for f in self.discovered_files.values()
+                            if f.file_type == 'schema']
+            calc_files = [f for f in self.discovered_files.values()
+                          if f.file_type == 'calculation']
+            supporting_files = schema_files + calc_files
+
+            # Parse schemas and calculation linkbases in the background while
+            # the instance loads; applying them to the processor stays serial
+            # and in the original order, since it mutates shared state
+            trees = (executor.map if executor else map)(_parse_supporting_file, supporting_files)
+
+            # Process main instance document first
+            main_instance = instance_files[0]
+            logger.debug("Loading main instance: %s", main_instance.path)
+
+            # Create appropriate processor based on file type
+            if main_instance.file_type == 'ixbrl':
+                self.base_processor = iXBRLProcessor()
+                self.base_processor.load_ixbrl_instance(main_instance.path)
+            else:
+                self.base_processor = XBRLProcessor()
+                self.base_processor.load_instance(main_instance.path)
+
+            parsed = dict(zip((f.path for f in supporting_files), trees))
 
         # Process schema files
-        schema_files = [f for f in self.discovered_files.values()
-                        if f.file_type == 'schema']
         for schema in schema_files:
             try:
-                print(f"Debug: Loading schema: {schema.path}")
-                self.base_processor.load_taxonomy(schema.path)
+                logger.debug("Loading schema: %s", schema.path)
+                self.base_processor.load_taxonomy(schema.path, tree=parsed[schema.path])
             except Exception as e:
                 print(f"Warning: Error loading schema {schema.path}: {e}")
 
         # Process calculation files
-        calc_files = [f for f in self.discovered_files.values()
-                      if f.file_type == 'calculation']
         for calc in calc_files:
             try:
-                print(f"Debug: Loading calculation: {calc.path}")
-                self.base_processor.load_calculation(calc.path)
+                logger.debug("Loading calculation: %s", calc.path)
+                self.base_processor.load_calculation(calc.path, tree=parsed[calc.path])
             except Exception as e:
                 print(f"Warning: Error loading calculation {calc.path}: {e}")
 
@@ -212,6 +294,34 @@ class XBRLFolderProcessor:
         """Access facts from the base processor."""
         return self.base_processor.facts if self.base_processor else []
 
+    @property
+    def facts_by_concept(self):
+        """Access facts grouped by concept from the base processor."""
+        return self.base_processor.facts_by_concept if self.base_processor else {}
+
+    @property
+    def facts_by_key(self):
+        """Access facts keyed by (concept, context_ref) from the base processor."""
+        return self.base_processor.facts_by_key if self.base_processor else {}
+
+    @property
+    def numeric_values(self):
+        """Access float fact values from the base processor."""
+        return self.base_processor.numeric_values
+
+    @property
+    def concept_names(self):
+        """Access the concept name array from the base processor."""
+        return self.base_processor.concept_names
+
+    def get_fact(self, concept: str, context_ref: Optional[str] = None):
+        """Look up a single fact through the base processor."""
+        return self.base_processor.get_fact(concept, context_ref) if self.base_processor else None
+
+    def get_facts(self, concept: str):
+        """Look up all facts for a concept through the base processor."""
+        return self.base_processor.get_facts(concept) if self.base_processor else []
+
     def validate(self) -> List[str]:
         return self.base_processor.validate()
 
@@ -4,60 +4,151 @@ from typing import List, Optional
 from pathlib import Path
 from lxml import etree
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from types import MappingProxyType
+import logging
+import re
+import sys
+
+logger = logging.getLogger(__name__)
+
+# iXBRL documents are XHTML: whitespace between inline elements and internally
+# declared entities are content, so only the DTD and network access are shut
+# off (and libxml2's size limits lifted) here
+_IXBRL_PARSER_OPTIONS = dict(huge_tree=True, load_dtd=False, no_network=True)
+
+# Compiled once; the namespace is bound per call since documents may map the
+# ix and xbrli prefixes to other versions of the specification.
+_XP_HIDDEN = etree.XPath('(.//*[local-name()="hidden" and namespace-uri()=$ns])[1]')
+_XP_CONTEXTS = etree.XPath('.//*[local-name()="context" and namespace-uri()=$ns]')
+_XP_UNITS = etree.XPath('.//*[local-name()="unit" and namespace-uri()=$ns]')
+
+# Plain numbers in the two numeric formats are cleaned with one match and a
+# translate; anything more unusual goes through the step-by-step rules.
+_NUMBER_RE = re.compile(r'\s*(?:[$€£¥]*(?P<num>[\d.,]+)%?[$€£¥]*|\((?P<neg>[\d.,]+)\))\s*')
+_NUMBER_FORMATS = {
+    'ixt:numdotdecimal': str.maketrans({',': None}),
+    'ixt:numcommadot': str.maketrans({'.': None, ',': '.'}),
+}
+
+
+# Number words and placeholder values _apply_scaling accepts, built once
+_NUMBER_WORDS = MappingProxyType({
+    'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
+    'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
+    'ten': '10'
+})
+_EMPTY_NUMBER_VALUES = frozenset(['—', '–', '-', 'n/a'])
+
+
+@lru_cache(maxsize=128)
+def _scale_factor(scale: str) -> Decimal:
+    """Return 10 ** scale for an ix scale attribute, built once per distinct value."""
+    return Decimal(10) ** int(scale)
+
+
+@lru_cache(maxsize=4096)
+def _transform_value(value: str, format: str) -> str:
+    """Apply iXBRL transformation rules to a non-empty value.
+
+    Filings repeat the same few strings ("0", "—", ...) many times, so
+    results are cached per (value, format) pair.
+    """
+    table = _NUMBER_FORMATS.get(format)
+    if table is not None:
+        match = _NUMBER_RE.fullmatch(value)
+        if match is not None:
+            if match['num'] is not None:
+                return match['num'].translate(table)
+            return '-' + match['neg'].translate(table)
+
+    # Strip whitespace first
+    value = value.strip()
+
+    # Handle number formats
+    if format == 'ixt:numdotdecimal':
+        # Format: 1,234.56 -> 1234.56
+        # Remove any currency symbols first
+        value = value.strip('$€£¥')
+        # Remove any commas used as thousand separators
+        value = value.replace(',', '')
+
+    elif format == 'ixt:numcommadot':
+        # Format: 1.234,56 -> 1234.56
+        # Remove currency symbols
+        value = value.strip('$€£¥')
+        # First remove dots (thousand separators)
+        value = value.replace('.', '')
+        # Then replace comma with dot for decimal
+        value = value.replace(',', '.')
+
+    # Handle parenthetical negatives: (123) -> -123
+    if value.startswith('(') and value.endswith(')'):
+        value = '-' + value[1:-1]
+
+    # Handle percentages: remove % and convert if needed
+    if value.endswith('%'):
+        value = value[:-1]
+        # Optionally convert to decimal: 12.5% -> 0.125
+        # Commenting out since your test expects to keep as-is
+        # value = str(float(value) / 100)
+
+    # Strip any remaining whitespace
+    value = value.strip()
+
+    return value
 
 
 class iXBRLProcessor(XBRLProcessor):
     """Extension of XBRLProcessor to handle Inline XBRL (iXBRL) documents."""
 
-    def __init__(self):
-        super().__init__()
-        self.namespaces.update({
-            'ix': 'http://www.xbrl.org/2013/inlineXBRL',
-            'ixt': 'http://www.xbrl.org/inlineXBRL/transformation/2020-02-12',
-            'ixt-sec': 'http://www.sec.gov/inlineXBRL/transformation/2015-08-31',
-            'html': 'http://www.w3.org/1999/xhtml'  # Add HTML namespace with explicit prefix
-        })
+    _DEFAULT_NAMESPACES = MappingProxyType({
+        **XBRLProcessor._DEFAULT_NAMESPACES,
+        'ix': 'http://www.xbrl.org/2013/inlineXBRL',
+        'ixt': 'http://www.xbrl.org/inlineXBRL/transformation/2020-02-12',
+        'ixt-sec': 'http://www.sec.gov/inlineXBRL/transformation/2015-08-31',
+        'html': 'http://www.w3.org/1999/xhtml'  # Add HTML namespace with explicit prefix
+    })
 
     def load_ixbrl_instance(self, instance_path: Path) -> None:
         """Load and parse an Inline XBRL (iXBRL) document."""
         try:
-            print("\nDebug: Starting iXBRL parsing")
-            tree = etree.parse(str(instance_path))
+            logger.debug("Starting iXBRL parsing")
+            tree = etree.parse(str(instance_path), parser=etree.XMLParser(**_IXBRL_PARSER_OPTIONS))
             root = tree.getroot()
 
             # Update namespaces from the document
             self.namespaces.update(root.nsmap)
+            self._refresh_namespace_index()
 
             # First find the hidden section which often contains contexts and units
-            hidden = root.find('.//ix:hidden', self.namespaces)
-            if hidden is not None:
-                print("Debug: Found hidden section")
+            hidden = _XP_HIDDEN(root, ns=self.namespaces['ix'])
+            if hidden:
+                hidden = hidden[0]
+                logger.debug("Found hidden section")
                 self._parse_hidden_section(hidden)
 
             # If no contexts found in hidden section, look in the main document
             if not self.contexts:
-                print("Debug: Looking for contexts in main document")
+                logger.debug("Looking for contexts in main document")
                 self._parse_contexts(root)
 
             # Same for units
             if not self.units:
-                print("Debug: Looking for units in main document")
+                logger.debug("Looking for units in main document")
                 self._parse_units(root)
 
             # Parse facts
-            print("\nDebug: Parsing facts")
+            logger.debug("Parsing facts")
             self._parse_ixbrl_facts(root)
 
-            print(f"\nDebug: Parsing complete:")
-            print(f"- Contexts: {len(self.contexts)}")
-            print(f"- Units: {len(self.units)}")
-            print(f"- Facts: {len(self.facts)}")
+            logger.debug("Parsing complete: %d contexts, %d units, %d facts",
+                         len(self.contexts), len(self.units), len(self.facts))
 
-            # Print sample of what was found
-            if self.facts:
-                print("\nDebug: Sample facts:")
+            # Log a sample of what was found
+            if logger.isEnabledFor(logging.DEBUG):
                 for fact in self.facts[:3]:
-                    print(f"- {fact.concept}: {fact.value}")
+                    logger.debug("Sample fact %s: %s", fact.concept, fact.value)
 
         except Exception as e:
             print(f"Error parsing iXBRL instance: {str(e)}")
@@ -65,28 +156,29 @@ class iXBRLProcessor(XBRLProcessor):
 
     def _parse_hidden_section(self, hidden_elem: etree.Element) -> None:
         """Parse the hidden section of an iXBRL document."""
-        print("\nDebug: Processing hidden section")
+        logger.debug("Processing hidden section")
 
         # Process hidden contexts
-        contexts = hidden_elem.findall('.//xbrli:context', self.namespaces)
-        print(f"Debug: Found {len(contexts)} contexts in hidden section")
+        contexts = _XP_CONTEXTS(hidden_elem, ns=self.namespaces['xbrli'])
+        logger.debug("Found %d contexts in hidden section", len(contexts))
         for context in contexts:
             ctx_id = context.get('id')
             if ctx_id:
+                # Interned like the ids of XBRL instance contexts
+                ctx_id = sys.intern(ctx_id)
                 entity = self._extract_entity(context)
                 period_data = self._extract_period(context)
-                scenario = self._extract_scenario(context)
 
                 self.contexts[ctx_id] = XBRLContext(
                     id=ctx_id,
                     entity=entity,
-                    scenario=scenario,
+                    scenario=self._extract_scenario(context),
                     **period_data
                 )
 
         # Process hidden units
-        units = hidden_elem.findall('.//xbrli:unit', self.namespaces)
-        print(f"Debug: Found {len(units)} units in hidden section")
+        units = _XP_UNITS(hidden_elem, ns=self.namespaces['xbrli'])
+        logger.debug("Found %d units in hidden section", len(units))
         for unit in units:
             self._process_unit_element(unit)
 
@@ -99,16 +191,23 @@ class iXBRLProcessor(XBRLProcessor):
         self.facts = []
 
         try:
-            # Find all types of facts
-            for fact_type in ['nonFraction', 'nonNumeric', 'fraction']:
-                # Try with namespace first
-                elements = root.findall(f'.//ix:{fact_type}', self.namespaces)
-
-                # If no elements found, try without namespace
-                if not elements:
-                    elements = root.findall(f'.//{fact_type}')
-
-                print(f"Debug: Found {len(elements)} {fact_type} facts")
+            # Collect all types of facts in one walk over the document, then
+            # process them type by type as before
+            fact_types = ['nonFraction', 'nonNumeric', 'fraction']
+            elements_by_type = {fact_type: [] for fact_type in fact_types}
+            ix_ns = self.namespaces['ix']
+            for elem in root.iter(*(f'{{{ix_ns}}}{fact_type}' for fact_type in fact_types)):
+                elements_by_type[elem.tag.rpartition('}')[2]].append(elem)
+
+            # If no elements found for a type, try without namespace
+            missing_types = [fact_type for fact_type in fact_types if not elements_by_type[fact_type]]
+            if missing_types:
+                for elem in root.iter(*missing_types):
+                    elements_by_type[elem.tag].append(elem)
+
+            for fact_type in fact_types:
+                elements = elements_by_type[fact_type]
+                logger.debug("Found %d %s facts", len(elements), fact_type)
 
                 for elem in elements:
                     fact = self._process_ixbrl_fact(elem)
@@ -154,11 +253,13 @@ class iXBRLProcessor(XBRLProcessor):
                 except (ValueError, InvalidOperation):
                     print(f"Warning: Failed to apply scaling {scale} to value {value}")
 
+            # Concept names and references repeat across facts, so each fact
+            # points at one shared string, as in XBRLProcessor._make_fact
             return XBRLFact(
-                concept=concept,
+                concept=sys.intern(concept),
                 value=value,
-                context_ref=context_ref,
-                unit_ref=unit_ref,
+                context_ref=sys.intern(context_ref),
+                unit_ref=sys.intern(unit_ref) if unit_ref is not None else None,
                 decimals=decimals,
                 precision=precision
             )
@@ -170,35 +271,29 @@ class iXBRLProcessor(XBRLProcessor):
     def _apply_scaling(self, value: str, scale: str) -> str:
         """
         Apply scaling factor to numeric values using Decimal for precise calculations.
-        """
-        # Dictionary for common number words
-        number_words = {
-            'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
-            'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
-            'ten': '10'
-        }
 
+        The power of ten for each scale comes from the cached _scale_factor.
+        """
         try:
             # Handle special characters and empty values
             value = value.strip().lower()
-            if not value or value in ['—', '–', '-', 'n/a']:
+            if not value or value in _EMPTY_NUMBER_VALUES:
                 return '0'
 
             # Convert number words to digits
-            if value in number_words:
-                value = number_words[value]
+            if value in _NUMBER_WORDS:
+                value = _NUMBER_WORDS[value]
 
             # Remove commas and other formatting
             clean_value = value.replace(',', '')
             decimal_value = Decimal(clean_value)
-            scale_factor = int(scale)
 
-            scaled_value = decimal_value * Decimal(10) ** scale_factor
+            scaled_value = decimal_value * _scale_factor(scale)
             return str(scaled_value.normalize())
 
         except (ValueError, InvalidOperation) as e:
             # Only print warning for values that aren't intentionally empty
-            if value not in ['—', '–', '-', 'n/a'] and value not in number_words:
+            if value not in _EMPTY_NUMBER_VALUES and value not in _NUMBER_WORDS:
                 print(f"Warning: Scaling error for value {value} with scale {scale}: {str(e)}")
             return value
 
@@ -222,55 +317,20 @@ class iXBRLProcessor(XBRLProcessor):
         """Apply iXBRL transformation rules to the value."""
         if not value or not format:
             return value
-
-        # Strip whitespace first
-        value = value.strip()
-
-        # Handle number formats
-        if format == 'ixt:numdotdecimal':
-            # Format: 1,234.56 -> 1234.56
-            # Remove any currency symbols first
-            value = value.strip('$€£¥')
-            # Remove any commas used as thousand separators
-            value = value.replace(',', '')
-
-        elif format == 'ixt:numcommadot':
-            # Format: 1.234,56 -> 1234.56
-            # Remove currency symbols
-            value = value.strip('$€£¥')
-            # First remove dots (thousand separators)
-            value = value.replace('.', '')
-            # Then replace comma with dot for decimal
-            value = value.replace(',', '.')
-
-        # Handle parenthetical negatives: (123) -> -123
-        if value.startswith('(') and value.endswith(')'):
-            value = '-' + value[1:-1]
-
-        # Handle percentages: remove % and convert if needed
-        if value.endswith('%'):
-            value = value[:-1]
-            # Optionally convert to decimal: 12.5% -> 0.125
-            # Commenting out since your test expects to keep as-is
-            # value = str(float(value) / 100)
-
-        # Strip any remaining whitespace
-        value = value.strip()
-
-        return value
+        return _transform_value(value, format)
 
     def _parse_units(self, root: etree.Element) -> None:
         """Override to handle both standard and iXBRL units."""
         # Try finding units with explicit namespace
-        units = root.findall('.//xbrli:unit', self.namespaces)
+        units = _XP_UNITS(root, ns=self.namespaces['xbrli'])
 
         if not units:
             # Try alternate approaches
             for ns in ['', 'http://www.xbrl.org/2003/instance']:
-                units = root.findall(f'.//{{{ns}}}unit')
+                units = _XP_UNITS(root, ns=ns)
                 if units:
                     break
 
-        print(f"Debug: Found {len(units)} units")
+        logger.debug("Found %d units", len(units))
         for unit in units:
             self._process_unit_element(unit)
\ No newline at end of file
@@ -1,10 +1,73 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field, InitVar
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
+from lxml import etree
 
 from pathlib import Path
 
-@dataclass
+def element_to_dict(element: etree.Element) -> dict:
+    """Convert an XML element and its descendants to a flat dictionary.
+
+    Elements are visited in document order, so a later element's key
+    overwrites an earlier one, as with the old recursive merge.
+    """
+    result = {}
+    for node in element.iter(etree.Element):
+        # Get the local name without namespace
+        tag = node.tag.rpartition('}')[2]
+        # Add text value if present
+        text = node.text
+        if text and text.strip():
+            result[tag] = text.strip()
+        # Add attributes if present
+        for attr, value in node.attrib.items():
+            result[f"{tag}@{attr.rpartition('}')[2]}"] = value
+    return result
+
+
+# Parser settings shared by the instance, schema and linkbase loaders.
+# Instance and linkbase documents are plain data: they need no entity
+# expansion, DTD or ID index, must never trigger network fetches, and real
+# filings can exceed libxml2's size limits
+_PARSER_OPTIONS = dict(huge_tree=True, collect_ids=False, remove_blank_text=True, resolve_entities=False,
+                       load_dtd=False, no_network=True)
+# Linkbases carry nothing in comments, so drop them too; instances keep them,
+# since a comment inside a fact splits its text
+_LINKBASE_PARSER_OPTIONS = dict(_PARSER_OPTIONS, remove_comments=True)
+
+
+# ASCII characters a string accepted by float() can start with, besides the
+# "inf"/"nan" spellings
+_NUMERIC_TEXT_START = frozenset('+-.0123456789')
+
+
+def is_numeric_value(value: Any) -> bool:
+    """Check whether a fact value is a number or a number-like string such as '1,000'."""
+    if isinstance(value, (int, float)):
+        return True
+    if isinstance(value, str):
+        # Settle ordinary text from its first character rather than letting
+        # float() raise for it; anything else is left to float() to decide
+        text = value.replace(',', '').lstrip()
+        if not text:
+            return False
+        first = text[0]
+        if first.isascii() and first not in _NUMERIC_TEXT_START and text[:3].lower() not in ('inf', 'nan'):
+            return False
+        try:
+            float(value.replace(',', ''))
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+def scenario_to_dict(scenario: etree.Element) -> Dict[str, Any]:
+    """Convert a scenario element to the {'segments': [...]} form used by contexts."""
+    return {'segments': [element_to_dict(child) for child in scenario.iterchildren(etree.Element)]}
+
+
+@dataclass(slots=True)
 class XBRLFile:
     path: Path
     file_type: str
@@ -13,14 +76,24 @@ class XBRLFile:
     role_refs: Dict[str, str] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class XBRLContext:
     id: str
     entity: str
     period_start: Optional[datetime] = None
     period_end: Optional[datetime] = None
     instant: Optional[datetime] = None
-    scenario: Optional[Dict[str, Any]] = None
+    # A scenario dict, or the serialized scenario element, which the parsers
+    # pass so that the dict is only built if it is read
+    scenario: InitVar[Union[Dict[str, Any], bytes, None]] = None
+    _scenario_xml: Optional[bytes] = field(default=None, init=False, repr=False)
+    _scenario: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self, scenario: Union[Dict[str, Any], bytes, None]) -> None:
+        if isinstance(scenario, bytes):
+            self._scenario_xml = scenario
+        else:
+            self._scenario = scenario
 
     @property
     def is_duration(self) -> bool:
@@ -31,7 +104,24 @@ class XBRLContext:
         return self.instant is not None
 
 
-@dataclass
+def _get_context_scenario(context: XBRLContext) -> Optional[Dict[str, Any]]:
+    """Scenario as a dict, built from the serialized element on first access."""
+    if context._scenario is None and context._scenario_xml is not None:
+        context._scenario = scenario_to_dict(etree.fromstring(context._scenario_xml))
+    return context._scenario
+
+
+def _set_context_scenario(context: XBRLContext, value: Optional[Dict[str, Any]]) -> None:
+    context._scenario = value
+
+
+# Attached after the class is built: defined in the class body, the property
+# would be taken as the default of the scenario init argument
+XBRLContext.scenario = property(_get_context_scenario, _set_context_scenario,
+                                doc=_get_context_scenario.__doc__)
+
+
+@dataclass(slots=True)
 class XBRLUnit:
     id: str
     measures: List[str]  # e.g., ['iso4217:USD'] or ['xbrli:pure']
@@ -40,11 +130,33 @@ class XBRLUnit:
     denominator: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class XBRLFact:
     concept: str
     value: Any
     context_ref: str
     unit_ref: Optional[str] = None
     decimals: Optional[int] = None
-    precision: Optional[int] = None
\ No newline at end of file
+    precision: Optional[int] = None
+    # Whether value is a number or number-like string; worked out once each
+    # time value is assigned, see _set_fact_value
+    is_numeric: bool = field(init=False, repr=False, compare=False)
+
+
+# The slot that holds a fact's value, wrapped by the value property below
+_FACT_VALUE_SLOT = XBRLFact.value
+
+
+def _get_fact_value(fact: XBRLFact) -> Any:
+    return _FACT_VALUE_SLOT.__get__(fact, XBRLFact)
+
+
+def _set_fact_value(fact: XBRLFact, value: Any) -> None:
+    """Store value and classify it, so is_numeric always matches the value."""
+    _FACT_VALUE_SLOT.__set__(fact, value)
+    fact.is_numeric = is_numeric_value(value)
+
+
+# Replaces the slot descriptor on the class; the generated __init__ assigns
+# value through it as well
+XBRLFact.value = property(_get_fact_value, _set_fact_value, doc="The fact's parsed value.")
@@ -1,81 +1,484 @@
 # xbrl_processor.py
-from core.models import XBRLContext, XBRLUnit, XBRLFact
+from core.models import (XBRLContext, XBRLUnit, XBRLFact, _NUMERIC_TEXT_START, _PARSER_OPTIONS,
+                         _LINKBASE_PARSER_OPTIONS)
+from dataclasses import fields
 from validators.calculation_validator import CalculationValidator
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 from lxml import etree
-import pandas as pd
+import numpy as np
+import csv
 import json
-from decimal import Decimal, InvalidOperation
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Compiled queries, shared by every processor instance.
+# _INSTANCE_NS binds both instance namespaces so that context lookups work
+# whichever one the document maps to the xbrli prefix.
+_XBRLI_2001_NS = {'xbrli': 'http://www.xbrl.org/2001/instance'}
+_INSTANCE_NS = {
+    'xbrli': 'http://www.xbrl.org/2001/instance',
+    'xbrli03': 'http://www.xbrl.org/2003/instance'
+}
+
+
+def _instance_xpath(path: str) -> etree.XPath:
+    """Compile path for both instance namespaces; {x} marks the prefix."""
+    return etree.XPath(' | '.join(path.format(x=prefix) for prefix in ('xbrli:', 'xbrli03:')),
+                       namespaces=_INSTANCE_NS)
+
+
+_XP_ANY_CONTEXTS = etree.XPath('.//*[local-name()="context" or local-name()="numericContext"]')
+_XP_NUMERIC_CONTEXTS = etree.XPath('.//xbrli:numericContext', namespaces=_XBRLI_2001_NS)
+
+# Clark tags of context children in both instance namespaces, for walking a
+# context with iter()/iterchildren() instead of evaluating XPath per context
+_IDENTIFIER_PARENTS = {f'{{{uri}}}identifier': f'{{{uri}}}entity' for uri in _INSTANCE_NS.values()}
+_IDENTIFIER_TAGS = tuple(_IDENTIFIER_PARENTS)
+_PERIOD_TAGS = tuple(f'{{{uri}}}period' for uri in _INSTANCE_NS.values())
+_PERIOD_FIELDS = {f'{{{uri}}}{local}': field
+                  for uri in _INSTANCE_NS.values()
+                  for local, field in (('instant', 'instant'), ('startDate', 'period_start'),
+                                       ('endDate', 'period_end'))}
+_XP_SCENARIO = _instance_xpath('.//{x}scenario')
+_XP_UNITS = etree.XPath('.//xbrli:unit', namespaces=_XBRLI_2001_NS)
+_XP_CONTEXT_UNIT = etree.XPath('./xbrli:unit', namespaces=_XBRLI_2001_NS)
+_XP_UNIT_MEASURES = etree.XPath('.//*[local-name()="measure"]')
+_XP_UNIT_DIVIDE = etree.XPath('./xbrli:divide', namespaces=_XBRLI_2001_NS)
+_XP_DIVIDE_NUMERATOR = etree.XPath('.//xbrli:numerator//xbrli:measure', namespaces=_XBRLI_2001_NS)
+_XP_DIVIDE_DENOMINATOR = etree.XPath('.//xbrli:denominator//xbrli:measure', namespaces=_XBRLI_2001_NS)
+
+_NUMERIC_CONTEXT_TAG = '{http://www.xbrl.org/2001/instance}numericContext'
+_UNIT_TAG = '{http://www.xbrl.org/2001/instance}unit'
+# Elements carrying a context reference outside the instance namespace ($ns)
+_XP_FACT_CANDIDATES = etree.XPath('.//*[(@contextRef or @numericContext) and namespace-uri() != $ns]')
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso_date(date_str: str) -> Optional[datetime]:
+    """Parse the two fixed XBRL date layouts without going through strptime.
+
+    Returns None for anything else so the caller can fall back to strptime,
+    which also produces the error message for malformed dates.
+    """
+    is_date = len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-'
+    is_datetime = (len(date_str) == 19 and date_str[4] == '-' and date_str[7] == '-'
+                   and date_str[10] == 'T' and date_str[13] == ':' and date_str[16] == ':')
+    if not (is_date or is_datetime):
+        return None
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        return None
+
+
+# Field names for the dict exports. Contexts and facts hold flat values, so
+# reading the fields directly replaces dataclasses.asdict and its deep copy.
+# The private fields, the raw scenario XML and its decoded dict, are not
+# exported, nor is the is_numeric flag derived from a fact's value.
+_CONTEXT_FIELDS = tuple(f.name for f in fields(XBRLContext) if not f.name.startswith('_'))
+_FACT_FIELDS = tuple(f.name for f in fields(XBRLFact) if f.name != 'is_numeric')
+
+_INF = float('inf')
+
+
+@lru_cache(maxsize=64)
+def _parse_numeric_value(value: str) -> Optional[int]:
+    """Parse a decimals/precision value; cached since filings use only a few."""
+    if value == 'INF':
+        # Handle special values defined in the XBRL specification
+        return _INF
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _flat_encoder(pad: str):
+    """Return a C-backed encode function that separates items with ',' + pad."""
+    return json.JSONEncoder(separators=(',' + pad, ': '), default=str).encode
+
+
+def _dumps(obj: Any, level: int = 0) -> str:
+    """Serialize obj as export_to_json does, indented to sit `level` levels deep."""
+    if (type(obj) is dict and obj and all(type(key) is str for key in obj)
+            and not any(isinstance(value, (dict, list, tuple)) for value in obj.values())):
+        # Flat dicts (every fact, most contexts) go through the C encoder, which
+        # json only uses without indent=; the item separator carries the
+        # newline and indentation the indenting encoder would have written
+        pad = '\n' + '  ' * (level + 1)
+        text = _flat_encoder(pad)(obj)
+        return '{' + pad + text[1:-1] + '\n' + '  ' * level + '}'
+    text = json.dumps(obj, indent=2, default=str)
+    # Encoded strings never contain raw newlines, so this only touches layout
+    return text.replace('\n', '\n' + '  ' * level) if level else text
+
+
+# Columns of the CSV export, in order
+_CSV_COLUMNS = ('concept', 'value', 'context_id', 'unit', 'entity', 'period_start', 'period_end', 'instant')
+
+
+def _csv_str(value: Any) -> str:
+    """Format a cell the way pandas writes an object column."""
+    if value is None or value != value:
+        return ''
+    return str(value)
+
+
+def _csv_float(value: Any) -> str:
+    """Format a cell the way pandas writes a float64 column."""
+    if value is None or value != value:
+        return ''
+    return repr(float(value))
+
+
+def _csv_value_format(values) -> Any:
+    """Pick the formatter pandas would use for a column of fact values.
+
+    pandas stores ints mixed with floats or missing values as float64, so
+    those ints come out as '1.0'; any other mix is written with str(). Ints
+    outside the int64 range are always written with str().
+    """
+    has_float = has_none = False
+    int_min = int_max = 0
+    for value in values:
+        if type(value) is int:
+            int_min = min(int_min, value)
+            int_max = max(int_max, value)
+        elif type(value) is float:
+            has_float = True
+        elif value is None:
+            has_none = True
+        else:
+            return _csv_str
+    if int_min < -2**63 or int_max >= 2**63:
+        return _csv_str
+    return _csv_float if has_float or has_none else _csv_str
+
+
+def _csv_datetime_format(values) -> Any:
+    """Pick the formatter pandas would use for a column of period dates.
+
+    A column of naive datetimes is written as plain dates when every value is
+    at midnight, otherwise with its time, and with microseconds if any has them.
+    """
+    layout = '%Y-%m-%d'
+    for value in values:
+        if value is None:
+            continue
+        if type(value) is not datetime or value.tzinfo is not None:
+            return _csv_str
+        if value.microsecond:
+            layout = '%Y-%m-%d %H:%M:%S.%f'
+        elif layout == '%Y-%m-%d' and (value.hour or value.minute or value.second):
+            layout = '%Y-%m-%d %H:%M:%S'
+    return lambda value: '' if value is None else value.strftime(layout)
+
+
+def parse_stream(source, tag=None):
+    """Yield elements of the document at source as their end tags are read.
+
+    source is a path or a binary file object, and tag optionally restricts
+    the elements yielded, as for etree.iterparse. Each element is cleared,
+    along with its already-seen siblings, once the caller moves on to the
+    next one, so only the current element is held in memory.
+    """
+    if not hasattr(source, 'read'):
+        source = str(source)
+    for _, elem in etree.iterparse(source, events=('end',), tag=tag, **_PARSER_OPTIONS):
+        yield elem
+        elem.clear(keep_tail=True)
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+class _FactList(list):
+    """The list behind XBRLProcessor.facts.
+
+    Every change other than adding facts at the end bumps version, so the
+    fact index can tell whether it only needs to take in new facts or has
+    to be rebuilt.
+    """
+    __slots__ = ('version',)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.version = 0
+
+
+def _bumps_version(name: str):
+    method = getattr(list, name)
+
+    def mutate(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+    mutate.__name__ = name
+    return mutate
+
+
+for _name in ('__setitem__', '__delitem__', '__imul__', 'insert', 'pop', 'remove', 'clear', 'sort', 'reverse'):
+    setattr(_FactList, _name, _bumps_version(_name))
+del _name
+
 
 class XBRLProcessor:
+    # Namespaces every processor starts with (and returns to on reset); read-only
+    # and shared, each instance works on its own copy
+    _DEFAULT_NAMESPACES = MappingProxyType({
+        'xbrli': 'http://www.xbrl.org/2001/instance',
+        'link': 'http://www.xbrl.org/2001/XLink/xbrllinkbase',
+        'xlink': 'http://www.w3.org/1999/xlink',
+        'iso4217': 'http://www.xbrl.org/2003/iso4217',
+        'iascf-pfs': 'http://www.xbrl.org/taxonomy/int/fr/ias/ci/pfs/2002-11-15',
+        'novartis': 'http://www.xbrl.org/taxonomy/int/fr/ias/pfs/2002-11-15/Novartis-2002-11-15'
+    })
+
     def __init__(self):
-        self.namespaces = {
-            'xbrli': 'http://www.xbrl.org/2001/instance',
-            'link': 'http://www.xbrl.org/2001/XLink/xbrllinkbase',
-            'xlink': 'http://www.w3.org/1999/xlink',
-            'iso4217': 'http://www.xbrl.org/2003/iso4217',
-            'iascf-pfs': 'http://www.xbrl.org/taxonomy/int/fr/ias/ci/pfs/2002-11-15'
-        }
+        self.namespaces = dict(self._DEFAULT_NAMESPACES)
         self.contexts: Dict[str, XBRLContext] = {}
         self.units: Dict[str, XBRLUnit] = {}
         self.facts: List[XBRLFact] = []
+        # Index of self.facts by concept and by (concept, context_ref), and
+        # the list, version and length it was built from, see _fact_index
+        self._facts_by_concept: Dict[str, List[XBRLFact]] = {}
+        self._facts_by_key: Dict[tuple, XBRLFact] = {}
+        self._indexed_facts: Optional[_FactList] = None
+        self._indexed_version = 0
+        self._indexed_count = 0
         self.schema_refs: List[str] = []
+        self.warnings: List[str] = []  # Warnings from the last validate() run
+        self.taxonomy_tree = None
+        self.calculation_tree = None
+        self._parser = etree.XMLParser(**_PARSER_OPTIONS)
+        self._linkbase_parser = etree.XMLParser(**_LINKBASE_PARSER_OPTIONS)
+        # Reverse namespace map and resolved concept names, see _get_concept_name
+        self._uri_to_prefix: Dict[str, str] = {}
+        self._concept_name_cache: Dict[str, str] = {}
+        # One shared bytes object per distinct scenario, see _extract_scenario
+        self._scenario_xml: Dict[bytes, bytes] = {}
+        self._refresh_namespace_index()
+
+    def reset(self) -> None:
+        """Forget everything loaded so far, so the processor can be reused.
+
+        The namespace, context, unit and fact containers are cleared in place
+        rather than replaced.
+        """
+        self.namespaces.clear()
+        self.namespaces.update(self._DEFAULT_NAMESPACES)
+        self.contexts.clear()
+        self.units.clear()
+        self.facts.clear()
+        self.schema_refs.clear()
+        self.warnings.clear()
         self.taxonomy_tree = None
         self.calculation_tree = None
+        self._scenario_xml.clear()
+        if hasattr(self, 'calculation_validator'):
+            del self.calculation_validator
+        self._refresh_namespace_index()
+
+    @property
+    def facts(self) -> List[XBRLFact]:
+        """The loaded facts, in document order."""
+        return self._facts
+
+    @facts.setter
+    def facts(self, facts: List[XBRLFact]) -> None:
+        # Assigned lists are copied into a _FactList, whose changes the
+        # fact index can follow
+        self._facts = facts if type(facts) is _FactList else _FactList(facts)
+
+    def _fact_index(self) -> None:
+        """Bring the concept and key indexes up to date with self.facts.
+
+        Facts added at the end of the list are indexed as they are found;
+        any other change to the list, or a new list, rebuilds the indexes.
+        Changing the concept or context_ref of a fact already in the list is
+        not picked up.
+        """
+        facts = self._facts
+        if self._indexed_facts is not facts or self._indexed_version != facts.version:
+            self._facts_by_concept = {}
+            self._facts_by_key = {}
+            self._indexed_facts = facts
+            self._indexed_version = facts.version
+            self._indexed_count = 0
+        if self._indexed_count == len(facts):
+            return
+
+        by_concept = self._facts_by_concept
+        by_key = self._facts_by_key
+        for fact in facts[self._indexed_count:]:
+            by_concept.setdefault(fact.concept, []).append(fact)
+            by_key.setdefault((fact.concept, fact.context_ref), fact)
+        self._indexed_count = len(facts)
+
+    @property
+    def facts_by_concept(self) -> Dict[str, List[XBRLFact]]:
+        """Facts grouped by concept name, in document order.
+
+        The index is kept between calls and follows changes to self.facts;
+        treat it as read-only.
+        """
+        self._fact_index()
+        return self._facts_by_concept
+
+    @property
+    def facts_by_key(self) -> Dict[tuple, XBRLFact]:
+        """The first fact for each (concept, context_ref) pair; read-only, as facts_by_concept."""
+        self._fact_index()
+        return self._facts_by_key
+
+    @property
+    def numeric_values(self) -> np.ndarray:
+        """Fact values as float64, aligned with self.facts.
+
+        Facts whose value is not an int or float (strings, None, ...) are NaN,
+        so np.isnan gives the non-numeric mask. The array is built from the
+        current values on each access; keep it rather than re-reading it.
+        """
+        return np.fromiter(
+            (fact.value if isinstance(fact.value, (int, float)) else np.nan for fact in self.facts),
+            dtype=np.float64, count=len(self.facts))
+
+    @property
+    def concept_names(self) -> np.ndarray:
+        """Fact concept names as a NumPy string array, aligned with self.facts.
+
+        Together with numeric_values this gives a column view of the facts, so
+        filters such as np.char.find(processor.concept_names, 'Revenue') >= 0
+        run in NumPy rather than a Python loop.
+        """
+        return np.array([fact.concept for fact in self.facts], dtype=str)
+
+    def get_fact(self, concept: str, context_ref: Optional[str] = None) -> Optional[XBRLFact]:
+        """Return the first fact for concept, optionally in a given context, or None."""
+        if context_ref is not None:
+            return self.facts_by_key.get((concept, context_ref))
+        facts = self.facts_by_concept.get(concept)
+        return facts[0] if facts else None
+
+    def get_facts(self, concept: str) -> List[XBRLFact]:
+        """Return all facts for concept, in document order."""
+        return list(self.facts_by_concept.get(concept, ()))
 
     def load_instance(self, instance_path: Path) -> None:
-        """Load and parse the main XBRL instance document."""
+        """Load and parse the main XBRL instance document.
+
+        The document is streamed with iterparse: each context, unit and fact is
+        handled as soon as its end tag is seen and then cleared, so the full
+        tree is never held in memory.
+        """
         try:
-            tree = etree.parse(str(instance_path))
-            root = tree.getroot()
+            self.units = {}
+            pending_facts = []
+            root = None
+            instance_prefix = None
+            handle_fact = self._handle_fact
+
+            for _, elem in etree.iterparse(str(instance_path), events=('end',), **_PARSER_OPTIONS):
+                if root is None:
+                    # The root start tag has been read by the first end event,
+                    # so its namespace declarations are already available
+                    root = elem.getroottree().getroot()
+                    self._update_namespaces(root.nsmap)
+                    instance_prefix = f'{{{self.namespaces["xbrli"]}}}'
+
+                tag = elem.tag
+                local_name = tag.rpartition('}')[2]
+                handled = False
+
+                if local_name in ('context', 'numericContext'):
+                    self._handle_context(elem)
+                    if tag == _NUMERIC_CONTEXT_TAG:
+                        self._handle_context_unit(elem)
+                    handled = True
+                elif tag == _UNIT_TAG:
+                    # Units embedded in a numericContext are picked up with
+                    # their context, so leave them in place until then
+                    parent = elem.getparent()
+                    if parent is None or parent.tag.rpartition('}')[2] != 'numericContext':
+                        self._process_unit_element(elem)
+                        handled = True
+
+                fact = handle_fact(elem, instance_prefix)
+                if fact is not None:
+                    pending_facts.append(fact)
+                    handled = True
+
+                if handled:
+                    # Drop the element and any already-processed siblings
+                    elem.clear(keep_tail=True)
+                    parent = elem.getparent()
+                    if parent is not None:
+                        while elem.getprevious() is not None:
+                            del parent[0]
 
-            # Update namespaces from the document
-            for prefix, uri in root.nsmap.items():
-                if prefix is not None:  # Skip default namespace
-                    self.namespaces[prefix] = uri
+            if not self.contexts:
+                logger.debug("No contexts found; root tag: %s", root.tag if root is not None else None)
 
-            # Handle both group and xbrl root elements
-            if root.tag.endswith('group'):
-                # If root is group, use it directly
-                process_root = root
-            else:
-                # Otherwise look for group element
-                group = root.find('.//group')
-                process_root = group if group is not None else root
+            # Facts may precede the contexts they refer to, so they are only
+            # matched against contexts and units once the whole stream is read
+            self.facts = self._resolve_facts(pending_facts)
+            logger.debug("Found %d facts", len(self.facts))
 
-            # Parse the main components
-            self._parse_contexts(process_root)
-            if not self.contexts:
-                # Debug output
-                print("\nDebug information:")
-                print("Root tag:", root.tag)
-                print("Available elements:", [elem.tag for elem in root.iter()][:10])
-                print("Searching with xpath:", root.xpath('.//xbrli:context', namespaces=self.namespaces))
+        except Exception as e:
+            raise ValueError(f"Error parsing XBRL instance: {str(e)}")
+
+    def load_instance_streaming(self, instance_path: Path) -> None:
+        """Load an instance document without building a tree at all.
+
+        Uses a parser target instead of iterparse: only contexts and units are
+        materialized, as small standalone subtrees, and facts are built from
+        their start tag and text. The resulting contexts, units and facts are
+        the same as load_instance's.
+        """
+        try:
+            self.units = {}
+            target = _InstanceTarget(self)
+            parser = etree.XMLParser(target=target, **_PARSER_OPTIONS)
+            etree.parse(str(instance_path), parser)
 
-            self._parse_units(process_root)
-            self._parse_facts(process_root)
+            self.facts = self._resolve_facts(target.facts)
+            logger.debug("Found %d facts", len(self.facts))
 
         except Exception as e:
             raise ValueError(f"Error parsing XBRL instance: {str(e)}")
 
-    def load_taxonomy(self, taxonomy_path: Path) -> None:
-        """Load and parse the taxonomy schema."""
+    def _update_namespaces(self, nsmap: Dict[Optional[str], str]) -> None:
+        """Merge the root element's namespace declarations into self.namespaces."""
+        for prefix, uri in nsmap.items():
+            if prefix is not None:  # Skip default namespace
+                self.namespaces[sys.intern(prefix)] = sys.intern(uri)
+        self._refresh_namespace_index()
+
+    def load_taxonomy(self, taxonomy_path: Path, tree: Optional[etree._ElementTree] = None) -> None:
+        """Load and parse the taxonomy schema, unless an already parsed tree is given."""
         try:
-            self.taxonomy_tree = etree.parse(str(taxonomy_path))
+            self.taxonomy_tree = tree if tree is not None else etree.parse(str(taxonomy_path), parser=self._parser)
             # Add any taxonomy-specific namespaces
             for prefix, uri in self.taxonomy_tree.getroot().nsmap.items():
                 if prefix and uri and prefix not in self.namespaces:
                     self.namespaces[prefix] = uri
+            self._refresh_namespace_index()
 
         except Exception as e:
             raise ValueError(f"Error loading taxonomy: {str(e)}")
 
-    def load_calculation(self, calculation_path: Path) -> None:
-        """Load and parse the calculation linkbase."""
+    def load_calculation(self, calculation_path: Path, tree: Optional[etree._ElementTree] = None) -> None:
+        """Load and parse the calculation linkbase, unless an already parsed tree is given."""
         try:
-            self.calculation_tree = etree.parse(str(calculation_path))
+            self.calculation_tree = (tree if tree is not None else
+                                     etree.parse(str(calculation_path), parser=self._linkbase_parser))
             # Process calculation relationships here
             self._process_calculation_links()
             
@@ -86,79 +489,49 @@ class XBRLProcessor:
         """Parse numeric attributes like decimals and precision."""
         if value is None:
             return None
+        return _parse_numeric_value(value)
 
-        try:
-            # Handle special values defined in the XBRL specification
-            if value == 'INF':
-                return float('inf')
-            return int(value)
-        except ValueError:
-            return None
-
-    def _parse_contexts(self, root: etree.Element) -> None:
-        """Parse context elements from the instance document."""
-        # List to collect all found contexts
-        contexts = []
-
-        # Try standard context elements first
-        contexts.extend(root.findall('.//xbrli:context', self.namespaces))
+    def _parse_contexts(self, root) -> None:
+        """Parse context elements from the instance document.
 
-        # Try numeric context elements
-        contexts.extend(root.findall('.//numericContext', {'': 'http://www.xbrl.org/2001/instance'}))
-
-        # Try with default namespace
-        if not contexts:
-            ns = {'': 'http://www.xbrl.org/2001/instance'}
-            contexts.extend(root.findall('.//context', ns))
+        root is either a parsed element or the path or binary file object of
+        a document, which is then streamed so that only one context is held in
+        memory at a time.
+        """
+        if not isinstance(root, etree._Element):
+            for context in parse_stream(root, tag=('{*}context', '{*}numericContext')):
+                self._handle_context(context)
+            return
 
-        # Try xpath with local-name for both types
-        if not contexts:
-            contexts.extend(root.xpath('.//*[local-name()="context" or local-name()="numericContext"]'))
+        # A single scan picks up context and numericContext elements in any
+        # namespace, which covers every fallback the lookup used to chain
+        contexts = _XP_ANY_CONTEXTS(root)
 
-        print(f"Debug: Found {len(contexts)} contexts")
+        logger.debug("Found %d contexts", len(contexts))
         if contexts:
-            print(f"Debug: First context: {etree.tostring(contexts[0])}")
+            logger.debug("First context: %s id=%s", contexts[0].tag, contexts[0].get('id'))
 
         for context in contexts:
-            context_id = context.get('id')
-            if not context_id:
-                continue
-
-            entity = self._extract_entity(context)
-            if entity:  # Only process if we got a valid entity
-                period_data = self._extract_period(context)
-                scenario = self._extract_scenario(context)
-
-                self.contexts[context_id] = XBRLContext(
-                    id=context_id,
-                    entity=entity,
-                    scenario=scenario,
-                    **period_data
-                )
+            self._handle_context(context)
 
-    def _extract_entity(self, context: etree.Element) -> Optional[str]:
-        """Extract entity identifier from context."""
-        # Try different namespace patterns for identifier element
-        identifier = None
-
-        # Pattern 1: Using xbrli namespace
-        identifier = context.find('.//xbrli:identifier', self.namespaces)
-
-        # Pattern 2: Using default namespace
-        if identifier is None:
-            identifier = context.find('.//identifier', {'': 'http://www.xbrl.org/2001/instance'})
-
-        # Pattern 3: Using local-name
-        if identifier is None:
-            matches = context.xpath('.//*[local-name()="identifier"]')
-            if matches:
-                identifier = matches[0]
-
-        if identifier is not None and identifier.text:
-            scheme = identifier.get('scheme', '')
-            entity_text = identifier.text.strip()
-            return f"{scheme}:{entity_text}" if scheme else entity_text
-        return None
+    def _handle_context(self, context: etree.Element) -> None:
+        """Parse a single context or numericContext element."""
+        context_id = context.get('id')
+        if not context_id:
+            return
+        # Interned so fact lookups against self.contexts share the same key object
+        context_id = sys.intern(context_id)
+
+        entity = self._extract_entity(context)
+        if entity:  # Only process if we got a valid entity
+            period_data = self._extract_period(context)
+
+            self.contexts[context_id] = XBRLContext(
+                id=context_id,
+                entity=entity,
+                scenario=self._extract_scenario(context),
+                **period_data
+            )
 
     def register_namespace(self, prefix: str, uri: str) -> None:
         """Register a new namespace mapping."""
@@ -166,28 +539,47 @@ class XBRLProcessor:
         # Register with empty prefix for default namespace if needed
         if uri == "http://www.xbrl.org/2001/instance":
             self.namespaces[''] = uri
+        self._refresh_namespace_index()
         etree.register_namespace(prefix, uri)
+
+    def _refresh_namespace_index(self) -> None:
+        """Rebuild the URI -> prefix map after self.namespaces changes."""
+        uri_to_prefix = {}
+        for prefix, uri in self.namespaces.items():
+            # The first prefix bound to a URI wins, as in a scan of self.namespaces
+            uri_to_prefix.setdefault(sys.intern(uri), prefix)
+        self._uri_to_prefix = uri_to_prefix
+        self._concept_name_cache = {}
+        self._indexed_namespace_count = len(self.namespaces)
     
     def _extract_entity(self, context: etree.Element) -> str:
         """Extract entity identifier from context."""
-        entity_elem = context.find('.//xbrli:entity/xbrli:identifier', self.namespaces)
-        if entity_elem is not None:
+        for entity_elem in context.iter(_IDENTIFIER_TAGS):
+            # The identifier must sit in an entity of its own namespace
+            if entity_elem.getparent().tag != _IDENTIFIER_PARENTS[entity_elem.tag]:
+                continue
             scheme = entity_elem.get('scheme', '')
             return f"{scheme}:{entity_elem.text}" if entity_elem.text else ''
         return ''
     
     def _extract_period(self, context: etree.Element) -> dict:
         """Extract period information from context."""
-        period = context.find('.//xbrli:period', self.namespaces)
+        period = next(context.iter(_PERIOD_TAGS), None)
         if period is None:
             return {}
-            
-        instant = period.find('xbrli:instant', self.namespaces)
-        if instant is not None:
-            return {'instant': self._parse_date(instant.text)}
-            
-        start = period.find('xbrli:startDate', self.namespaces)
-        end = period.find('xbrli:endDate', self.namespaces)
+
+        # One pass over the period's children keeps the first of each kind
+        found = {}
+        for child in period.iterchildren():
+            field = _PERIOD_FIELDS.get(child.tag)
+            if field is not None:
+                found.setdefault(field, child)
+
+        if 'instant' in found:
+            return {'instant': self._parse_date(found['instant'].text)}
+
+        start = found.get('period_start')
+        end = found.get('period_end')
         return {
             'period_start': self._parse_date(start.text) if start is not None else None,
             'period_end': self._parse_date(end.text) if end is not None else None
@@ -199,66 +591,50 @@ class XBRLProcessor:
         all_units = []
 
         # Try standard units
-        ns = {'xbrli': 'http://www.xbrl.org/2001/instance'}
-        standalone_units = root.findall('.//xbrli:unit', ns)
-        if standalone_units:
-            all_units.extend(standalone_units)
+        all_units.extend(_XP_UNITS(root))
 
         # Try finding numericContext elements and extract their units
-        for context in root.findall('.//numericContext', {'': 'http://www.xbrl.org/2001/instance'}):
-            context_id = context.get('id')
-            if not context_id:
-                continue
-
-            # Find unit within this context
-            unit = context.find('./unit', {'': 'http://www.xbrl.org/2001/instance'})
-            if unit is not None:
-                # Store reference to process this unit with its context ID
-                all_units.append((unit, context_id))
+        numeric_contexts = _XP_NUMERIC_CONTEXTS(root)
 
-        print(f"Debug: Found {len(all_units)} units")
+        logger.debug("Found %d units", len(all_units) + len(numeric_contexts))
 
         # Process all found units
-        for unit_item in all_units:
-            if isinstance(unit_item, tuple):
-                unit, context_id = unit_item
-                self._process_unit_element(unit, context_id)
-            else:
-                self._process_unit_element(unit_item)
+        for unit in all_units:
+            self._process_unit_element(unit)
+        for context in numeric_contexts:
+            self._handle_context_unit(context)
+
+    def _handle_context_unit(self, context: etree.Element) -> None:
+        """Register the unit embedded in a numericContext under the context's ID."""
+        context_id = context.get('id')
+        if not context_id:
+            return
+
+        # Find unit within this context
+        unit = _XP_CONTEXT_UNIT(context)
+        if unit:
+            self._process_unit_element(unit[0], context_id)
 
     def _process_unit_element(self, unit: etree.Element, override_id: str = None) -> None:
         """Process a single unit element."""
         unit_id = override_id or unit.get('id')
         if not unit_id:
             return
+        unit_id = sys.intern(unit_id)
 
-        measures = []
+        # Measures may sit directly under the unit or inside a divide; one
+        # compiled query matches measure elements at any depth and in any
+        # namespace. Units repeat a few measure names, so each is interned
+        measures = [sys.intern(m.text.strip()) for m in _XP_UNIT_MEASURES(unit) if m.text]
         numerator = []
         denominator = []
-        divide = False
-
-        # Try finding measure elements in the default instance namespace
-        for measure in unit.findall('./measure', {'': 'http://www.xbrl.org/2001/instance'}):
-            if measure.text:
-                measures.append(measure.text.strip())
-
-        # If no measures found, try with xbrli namespace
-        if not measures:
-            for measure in unit.findall('.//xbrli:measure', self.namespaces):
-                if measure.text:
-                    measures.append(measure.text.strip())
 
         # Handle divide relationships
-        divide_elem = unit.find('./divide', {'': 'http://www.xbrl.org/2001/instance'})
-        if divide_elem is not None:
-            divide = True
-            for num_measure in divide_elem.findall('.//numerator//measure', {'': 'http://www.xbrl.org/2001/instance'}):
-                if num_measure.text:
-                    numerator.append(num_measure.text.strip())
-            for den_measure in divide_elem.findall('.//denominator//measure',
-                                                   {'': 'http://www.xbrl.org/2001/instance'}):
-                if den_measure.text:
-                    denominator.append(den_measure.text.strip())
+        divide_elems = _XP_UNIT_DIVIDE(unit)
+        divide = bool(divide_elems)
+        if divide:
+            numerator = [sys.intern(m.text.strip()) for m in _XP_DIVIDE_NUMERATOR(divide_elems[0]) if m.text]
+            denominator = [sys.intern(m.text.strip()) for m in _XP_DIVIDE_DENOMINATOR(divide_elems[0]) if m.text]
 
         if measures or numerator:  # Only create unit if we found any measures
             self.units[unit_id] = XBRLUnit(
@@ -269,94 +645,112 @@ class XBRLProcessor:
                 denominator=denominator
             )
 
-    def _extract_scenario(self, context: etree.Element) -> Optional[Dict[str, Any]]:
-        """Extract scenario information from context."""
-        scenario = context.find('.//xbrli:scenario', self.namespaces)
-        if scenario is None:
+    def _extract_scenario(self, context: etree.Element) -> Optional[bytes]:
+        """Extract the raw scenario XML from context.
+
+        The dict form is only built if XBRLContext.scenario is accessed, so
+        exports that never look at scenarios skip the subtree walk. Contexts
+        often repeat a scenario, so equal serialisations share one object.
+        """
+        scenario = _XP_SCENARIO(context)
+        if not scenario:
             return None
-            
-        return {'segments': [self._element_to_dict(child) for child in scenario]}
-
-    def _element_to_dict(self, element: etree.Element) -> dict:
-        """Convert an XML element to a dictionary representation."""
-        # Get the local name without namespace
-        tag = element.tag.split('}')[-1] if '}' in element.tag else element.tag
-
-        result = {}
-        # Add text value if present
-        if element.text and element.text.strip():
-            result[tag] = element.text.strip()
-        # Add attributes if present
-        if element.attrib:
-            for attr, value in element.attrib.items():
-                attr_name = attr.split('}')[-1] if '}' in attr else attr
-                result[f"{tag}@{attr_name}"] = value
-        # Add children recursively
-        for child in element:
-            child_dict = self._element_to_dict(child)
-            result.update(child_dict)
-        return result
 
-    def _parse_facts(self, root: etree.Element) -> None:
-        """Extract facts from the instance document."""
-        # Clear existing facts to prevent duplicates
-        self.facts = []
+        scenario_xml = etree.tostring(scenario[0], with_tail=False)
+        return self._scenario_xml.setdefault(scenario_xml, scenario_xml)
 
-        # Debug all namespaces in document
-        print("Debug: Available namespaces:", root.nsmap)
+    def _parse_facts(self, root) -> None:
+        """Extract facts from the instance document.
 
-        # Find facts from all relevant namespaces
-        facts_found = []
+        As with _parse_contexts, root may also be a document path or file
+        object to stream. Contexts and units must already be loaded either way.
+        """
+        if not isinstance(root, etree._Element):
+            instance_prefix = f'{{{self.namespaces["xbrli"]}}}'
+            facts_found = []
+            for elem in parse_stream(root):
+                fact = self._handle_fact(elem, instance_prefix)
+                if fact is not None:
+                    facts_found.append(fact)
+            self.facts = self._resolve_facts(facts_found)
+            return
 
-        # Add known financial reporting namespaces
-        self.namespaces.update({
-            'iascf-pfs': 'http://www.xbrl.org/taxonomy/int/fr/ias/ci/pfs/2002-11-15',
-            'novartis': 'http://www.xbrl.org/taxonomy/int/fr/ias/pfs/2002-11-15/Novartis-2002-11-15'
-        })
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Available namespaces: %s", root.nsmap)
 
         # Find all elements that could be facts
-        for child in root.iter():
-            # Skip elements in instance namespace
-            if child.tag.startswith(f'{{{self.namespaces["xbrli"]}}}'):
-                continue
+        instance_ns = self.namespaces['xbrli']
+        instance_prefix = f'{{{instance_ns}}}'
+        facts_found = []
+        for candidate in _XP_FACT_CANDIDATES(root, ns=instance_ns):
+            fact = self._handle_fact(candidate, instance_prefix)
+            if fact is not None:
+                facts_found.append(fact)
 
-            # Get context reference - try both styles
-            context_ref = child.get('contextRef') or child.get('numericContext')
-            if not context_ref:
-                continue
+        # Clear existing facts to prevent duplicates
+        self.facts = self._resolve_facts(facts_found)
 
-            # Only process if we have the context
-            if context_ref in self.contexts:
-                # Extract numeric attributes
-                decimals = self._parse_numeric_attribute(child.get('decimals'))
-                precision = self._parse_numeric_attribute(child.get('precision'))
-
-                # Get unit reference either from attribute or numeric context
-                unit_ref = child.get('unitRef')
-                if not unit_ref and context_ref in self.contexts:
-                    # If numeric context has an embedded unit, use the context ID as the unit reference
-                    # since we've already extracted these units in _parse_units
-                    if self.contexts[context_ref] and context_ref in self.units:
-                        unit_ref = context_ref
-
-                # Extract value
-                value = self._extract_fact_value(child)
-                if value is not None:
-                    fact = XBRLFact(
-                        concept=self._get_concept_name(child),
-                        value=value,
-                        context_ref=context_ref,
-                        unit_ref=unit_ref,
-                        decimals=decimals,
-                        precision=precision
-                    )
-                    facts_found.append(fact)
+        logger.debug("Found %d facts", len(self.facts))
+        if self.facts:
+            logger.debug("First fact: %s", self.facts[0])
 
-        print(f"Debug: Found {len(facts_found)} facts")
-        if facts_found:
-            print(f"Debug: First fact: {facts_found[0]}")
+    def _handle_fact(self, elem: etree.Element, instance_prefix: Optional[str] = None) -> Optional[XBRLFact]:
+        """Build a fact from a single element, or return None if it is not one.
+
+        Context and unit references are taken as written; _resolve_facts
+        matches them against the parsed contexts and units. Callers looping
+        over many elements pass the '{xbrli-namespace}' tag prefix in.
+        """
+        if instance_prefix is None:
+            instance_prefix = f'{{{self.namespaces["xbrli"]}}}'
+
+        # Skip elements in instance namespace
+        tag = elem.tag
+        if not isinstance(tag, str) or tag.startswith(instance_prefix):
+            return None
 
-        self.facts.extend(facts_found)
+        # Get context reference - try both styles
+        context_ref = elem.get('contextRef') or elem.get('numericContext')
+        if not context_ref:
+            return None
+
+        return self._make_fact(tag, elem, context_ref, elem.text)
+
+    def _make_fact(self, tag: str, attrib, context_ref: str, text: Optional[str]) -> Optional[XBRLFact]:
+        """Build a fact from an element's tag, attributes and text.
+
+        attrib only needs a get() method, so an element or a plain dict works.
+        """
+        # Extract value
+        value = self._convert_fact_value(text, attrib.get('sign', ''))
+        if value is None:
+            return None
+
+        # Facts share a handful of context/unit ids, so intern them once instead
+        # of keeping a separate string per fact (concept names come pre-interned)
+        unit_ref = attrib.get('unitRef')
+        return XBRLFact(
+            concept=self._concept_name(tag),
+            value=value,
+            context_ref=sys.intern(context_ref),
+            unit_ref=sys.intern(unit_ref) if unit_ref else None,
+            decimals=self._parse_numeric_attribute(attrib.get('decimals')),
+            precision=self._parse_numeric_attribute(attrib.get('precision'))
+        )
+
+    def _resolve_facts(self, facts: List[XBRLFact]) -> List[XBRLFact]:
+        """Keep the facts whose context was parsed and fill in embedded units."""
+        resolved = []
+        for fact in facts:
+            # Only keep facts if we have the context
+            if fact.context_ref not in self.contexts:
+                continue
+            # If numeric context has an embedded unit, use the context ID as the unit reference
+            # since we've already extracted these units in _parse_units
+            if not fact.unit_ref and fact.context_ref in self.units:
+                fact.unit_ref = fact.context_ref
+            resolved.append(fact)
+        return resolved
 
     def _parse_date(self, date_str: str) -> datetime:
         """Parse XBRL date string to datetime object.
@@ -377,6 +771,9 @@ class XBRLProcessor:
             return None
 
         date_str = date_str.strip()
+        parsed = _parse_iso_date(date_str)
+        if parsed is not None:
+            return parsed
 
         try:
             # Try simple date format first
@@ -389,19 +786,25 @@ class XBRLProcessor:
 
     def _get_concept_name(self, elem: etree.Element) -> str:
         """Get the concept name including namespace prefix."""
-        tag = elem.tag
+        return self._concept_name(elem.tag)
+
+    def _concept_name(self, tag: str) -> str:
+        """Get the concept name for a Clark-notation tag, via the cache."""
+        # Callers may add to self.namespaces directly; pick that up here
+        if len(self.namespaces) != self._indexed_namespace_count:
+            self._refresh_namespace_index()
+
+        name = self._concept_name_cache.get(tag)
+        if name is None:
+            # Interned so every fact of a concept shares one name string
+            name = self._concept_name_cache[tag] = sys.intern(self._resolve_concept_name(tag))
+        return name
+
+    def _resolve_concept_name(self, tag: str) -> str:
+        """Map a Clark-notation tag to prefix:localname."""
         if tag.startswith('{'):
-            # Extract namespace and localname from Clark notation
-            ns_uri = tag[1:tag.index('}')]
-            localname = tag[tag.index('}') + 1:]
-
-            # Find prefix for this namespace
-            prefix = None
-            for pre, uri in self.namespaces.items():
-                if uri == ns_uri:
-                    prefix = pre
-                    break
-
+            ns_uri, _, localname = tag[1:].partition('}')
+            prefix = self._uri_to_prefix.get(ns_uri)
             if prefix:
                 return f"{prefix}:{localname}"
 
@@ -410,18 +813,27 @@ class XBRLProcessor:
 
     def _extract_fact_value(self, elem: etree.Element) -> Any:
         """Extract and type-convert fact values."""
-        if elem.text is None:
+        return self._convert_fact_value(elem.text, elem.get('sign', ''))
+
+    def _convert_fact_value(self, text: Optional[str], sign: str) -> Any:
+        """Type-convert a fact's text, applying its sign attribute."""
+        if text is None:
             return None
 
-        value = elem.text.strip()
+        value = text.strip()
         if not value:
             return None
 
         # Check for special attributes
-        sign = elem.get('sign', '')
         if sign == '-':
             value = f'-{value}'
 
+        # Text facts can be told apart by their first character, which saves
+        # raising and catching a ValueError for each of them. Non-ASCII values
+        # still take the slow path, as int() and float() accept Unicode digits
+        if value[0] not in _NUMERIC_TEXT_START and value.isascii():
+            return value
+
         # Try numeric conversion
         try:
             if '.' in value:
@@ -447,6 +859,7 @@ class XBRLProcessor:
             if prefix is not None:  # Skip default namespace
                 self.namespaces[prefix] = uri
                 self.calculation_validator.namespaces[prefix] = uri
+        self._refresh_namespace_index()
 
         # Parse calculation relationships - pass the ElementTree directly
         self.calculation_validator.load_calculation_linkbase(self.calculation_tree)
@@ -456,24 +869,19 @@ class XBRLProcessor:
         if not hasattr(self, 'calculation_validator'):
             return ["No calculation relationships loaded"]
 
-        # Organize facts by context
-        facts_by_context: Dict[str, Dict[str, Decimal]] = {}
+        # Organize numeric facts by context. Values are passed as parsed; the
+        # validator screens them as floats and only converts the few it has
+        # to check exactly to Decimal
+        facts_by_context: Dict[str, Dict[str, Union[int, float]]] = {}
 
         for fact in self.facts:
-            if fact.context_ref and fact.value is not None:
-                try:
-                    # Convert value to Decimal for calculation
-                    if isinstance(fact.value, (int, float)):
-                        decimal_value = Decimal(str(fact.value))
+            if fact.context_ref and isinstance(fact.value, (int, float)):
+                # Initialize context dict if needed
+                if fact.context_ref not in facts_by_context:
+                    facts_by_context[fact.context_ref] = {}
 
-                        # Initialize context dict if needed
-                        if fact.context_ref not in facts_by_context:
-                            facts_by_context[fact.context_ref] = {}
-
-                        # Store fact value
-                        facts_by_context[fact.context_ref][fact.concept] = decimal_value
-                except (ValueError, TypeError, InvalidOperation) as e:
-                    print(f"Warning: Could not convert value for {fact.concept}: {e}")
+                # Store fact value
+                facts_by_context[fact.context_ref][fact.concept] = fact.value
 
         # Validate calculations using the validator
         return self.calculation_validator.validate_calculations(facts_by_context)
@@ -506,10 +914,29 @@ class XBRLProcessor:
 
         return summary
 
+    def find_summary_by_concept(self, concept: str) -> Dict[str, List[str]]:
+        """Get the calculation summary entries of the roles that involve concept.
+
+        Saves callers from searching the formatted lines of every role.
+        """
+        if not hasattr(self, 'calculation_validator'):
+            return {}
+
+        roles = {rel.role
+                 for rels in self.calculation_validator.calc_relationships.values()
+                 for rel in rels if concept in (rel.parent, rel.child)}
+        if not roles:
+            return {}
+        return {role: items for role, items in self.get_calculation_summary().items() if role in roles}
+
     def validate(self) -> List[str]:
-        """Perform all validation checks including calculations."""
+        """Perform all validation checks including calculations.
+
+        Errors are returned; warnings are printed and kept in self.warnings.
+        """
         errors = []
         warnings = []
+        self.warnings = warnings
 
         text_block_patterns = ['TextBlock', 'Policy', 'Policies', 'Disclosure']
         unitless_numeric_patterns = [
@@ -528,47 +955,58 @@ class XBRLProcessor:
             'OtherComprehensiveIncome'
         ]
 
+        # Resolve dangling references with two set differences up front, so the
+        # per-fact checks below only probe the (usually empty) offender sets
+        missing_contexts = {fact.context_ref for fact in self.facts} - self.contexts.keys()
+        missing_units = {fact.unit_ref for fact in self.facts if fact.unit_ref} - self.units.keys()
+
+        # Facts repeat a small set of concepts, so run the pattern scans once per
+        # distinct concept rather than once per fact
+        concept_flags = {
+            concept: (
+                any(pattern in concept for pattern in text_block_patterns),
+                any(pattern in concept for pattern in unitless_numeric_patterns),
+                any(indicator in concept for indicator in always_numeric_concepts)
+            )
+            for concept in {fact.concept for fact in self.facts}
+        }
+
         for fact_index, fact in enumerate(self.facts):
             location = f"Fact #{fact_index + 1}"
 
             # Context validation
-            if fact.context_ref not in self.contexts:
+            if missing_contexts and fact.context_ref in missing_contexts:
                 errors.append(f"[{location}] Fact {fact.concept} references missing context {fact.context_ref}")
 
+            is_text_block, is_unitless, numeric_concept = concept_flags[fact.concept]
+
             # Skip text blocks
-            if any(pattern in fact.concept for pattern in text_block_patterns):
+            if is_text_block:
                 continue
 
             # Determine numeric status
-            is_numeric = isinstance(fact.value, (int, float))
+            is_numeric = fact.is_numeric
             should_have_unit = False
 
             if isinstance(fact.value, str):
-                # Try to convert string to number
-                try:
-                    float(fact.value.replace(',', ''))
-                    is_numeric = True
-                except ValueError:
-                    pass
-
                 # Check if concept should be numeric
                 should_be_numeric = (
-                        any(indicator in fact.concept for indicator in always_numeric_concepts) and
+                        numeric_concept and
                         not fact.value.startswith(('http://', 'https://'))
                 )
             else:
                 # For non-string values, only check numeric indicators
-                should_be_numeric = any(indicator in fact.concept for indicator in always_numeric_concepts)
+                should_be_numeric = numeric_concept
 
             # Determine unit requirements
-            if is_numeric and not any(pattern in fact.concept for pattern in unitless_numeric_patterns):
+            if is_numeric and not is_unitless:
                 should_have_unit = True
 
             # Validate units
             if should_have_unit:
                 if not fact.unit_ref:
                     errors.append(f"[{location}] Numeric fact {fact.concept} missing required unit reference")
-                elif fact.unit_ref not in self.units:
+                elif missing_units and fact.unit_ref in missing_units:
                     errors.append(f"[{location}] Fact {fact.concept} references missing unit {fact.unit_ref}")
             elif fact.unit_ref and not should_be_numeric:
                 warnings.append(f"[{location}] Non-numeric fact {fact.concept} has unit reference")
@@ -594,35 +1032,186 @@ class XBRLProcessor:
     def to_dict(self) -> dict:
         """Convert the parsed XBRL data to a dictionary format."""
         return {
-            'contexts': {k: vars(v) for k, v in self.contexts.items()},
-            'units': {k: vars(v) for k, v in self.units.items()},
-            'facts': [vars(f) for f in self.facts]
+            'contexts': {k: self._context_to_dict(v) for k, v in self.contexts.items()},
+            'units': {k: self._unit_to_dict(v) for k, v in self.units.items()},
+            'facts': [self._fact_to_dict(f) for f in self.facts]
+        }
+
+    def _context_to_dict(self, context: XBRLContext) -> dict:
+        """Convert a context to a dictionary, materializing its scenario."""
+        result = {name: getattr(context, name) for name in _CONTEXT_FIELDS}
+        result['scenario'] = context.scenario
+        return result
+
+    def _unit_to_dict(self, unit: XBRLUnit) -> dict:
+        """Convert a unit to a dictionary; measure lists are copied."""
+        return {
+            'id': unit.id,
+            'measures': list(unit.measures),
+            'divide': unit.divide,
+            'numerator': list(unit.numerator),
+            'denominator': list(unit.denominator)
         }
 
+    def _fact_to_dict(self, fact: XBRLFact) -> dict:
+        """Convert a fact to a dictionary."""
+        return {name: getattr(fact, name) for name in _FACT_FIELDS}
+
     def export_to_json(self, output_path: Path) -> None:
-        """Export the parsed data to JSON format."""
-        data = self.to_dict()
+        """Export the parsed data to JSON format.
+
+        Produces the same document as json.dump(self.to_dict(), indent=2) but
+        writes it entry by entry, so the full dict is never built in memory.
+        """
+        sections = [
+            ('contexts', '{}', ((k, self._context_to_dict(v)) for k, v in self.contexts.items())),
+            ('units', '{}', ((k, self._unit_to_dict(v)) for k, v in self.units.items())),
+            ('facts', '[]', ((None, self._fact_to_dict(fact)) for fact in self.facts))
+        ]
         with output_path.open('w') as f:
-            json.dump(data, f, indent=2, default=str)
+            f.write('{')
+            for section_index, (name, (open_bracket, close_bracket), entries) in enumerate(sections):
+                f.write(',\n' if section_index else '\n')
+                f.write(f'  {_dumps(name)}: {open_bracket}')
+                empty = True
+                for key, value in entries:
+                    f.write('\n' if empty else ',\n')
+                    empty = False
+                    # List entries (facts) have no key
+                    prefix = f'{_dumps(key)}: ' if key is not None else ''
+                    f.write(f'    {prefix}{_dumps(value, level=2)}')
+                f.write(close_bracket if empty else f'\n  {close_bracket}')
+            f.write('\n}')
 
     def export_to_csv(self, output_path: Path) -> None:
-        """Export facts to CSV format."""
-        rows = []
+        """Export facts to CSV format.
+
+        Rows are written one at a time with csv.writer. The cells are formatted
+        as the earlier pandas.DataFrame.to_csv export wrote them, so the file
+        is the same without building a frame first.
+        """
+        unit_measure = {uid: (u.measures[0] if u.measures else '') for uid, u in self.units.items()}
+
+        # Look up every context and unit before opening the file, so a fact with
+        # an unknown reference fails without leaving a partial export behind
+        contexts = [self.contexts[fact.context_ref] for fact in self.facts]
         for fact in self.facts:
-            context = self.contexts[fact.context_ref]
-            row = {
-                'concept': fact.concept,
-                'value': fact.value,
-                'context_id': fact.context_ref,
-                'unit': self.units[fact.unit_ref].measures[0] if fact.unit_ref else '',
-                'entity': context.entity,
-                'period_start': context.period_start,
-                'period_end': context.period_end,
-                'instant': context.instant
-            }
-            rows.append(row)
-        
-        df = pd.DataFrame(rows)
-        df.to_csv(output_path, index=False)
+            if fact.unit_ref and fact.unit_ref not in unit_measure:
+                raise KeyError(fact.unit_ref)
+
+        format_value = _csv_value_format(fact.value for fact in self.facts)
+        format_start, format_end, format_instant = (
+            _csv_datetime_format(getattr(context, name) for context in contexts)
+            for name in ('period_start', 'period_end', 'instant'))
+
+        with output_path.open('w', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(_CSV_COLUMNS)
+            writer.writerows(
+                (fact.concept, format_value(fact.value), fact.context_ref,
+                 unit_measure[fact.unit_ref] if fact.unit_ref else '', context.entity,
+                 format_start(context.period_start), format_end(context.period_end),
+                 format_instant(context.instant))
+                for fact, context in zip(self.facts, contexts))
+
+
+class _InstanceTarget:
+    """Parser target behind XBRLProcessor.load_instance_streaming.
+
+    Contexts and 2001-style units are handed to an etree.TreeBuilder and
+    passed to the processor's usual handlers once complete. Every other
+    element is only looked at as a possible fact: its tag, attributes and
+    leading text, which is all _make_fact needs.
+    """
+
+    def __init__(self, processor: XBRLProcessor):
+        self.processor = processor
+        self.facts: List[XBRLFact] = []
+        self.instance_prefix: Optional[str] = None
+        # Builder for the context or unit being read, and how deep we are in it
+        self.builder: Optional[etree.TreeBuilder] = None
+        self.builder_depth = 0
+        # One entry per open element: [tag, attrib, context_ref, text parts,
+        # collecting] for possible facts, None otherwise. Collecting stops once
+        # a child, comment or processing instruction starts, since only
+        # leading text counts as the value.
+        self.stack: List[Optional[list]] = []
+
+    def start(self, tag, attrib, nsmap):
+        if self.instance_prefix is None:
+            # The first start tag is the root, whose declarations we adopt.
+            # Targets see the default namespace under '' rather than None.
+            self.processor._update_namespaces({prefix or None: uri for prefix, uri in nsmap.items()})
+            self.instance_prefix = f'{{{self.processor.namespaces["xbrli"]}}}'
+
+        if self.builder is not None:
+            self.builder.start(tag, attrib, nsmap)
+            self.builder_depth += 1
+            return
+
+        self._stop_collecting()
 
+        if tag.rpartition('}')[2] in ('context', 'numericContext') or tag == _UNIT_TAG:
+            self.builder = etree.TreeBuilder()
+            self.builder.start(tag, attrib, nsmap)
+            self.builder_depth = 1
+            return
+
+        # Get context reference - try both styles
+        context_ref = attrib.get('contextRef') or attrib.get('numericContext')
+        if context_ref and not tag.startswith(self.instance_prefix):
+            self.stack.append([tag, dict(attrib), context_ref, [], True])
+        else:
+            self.stack.append(None)
+
+    def data(self, data):
+        if self.builder is not None:
+            self.builder.data(data)
+        elif self.stack and self.stack[-1] is not None and self.stack[-1][4]:
+            self.stack[-1][3].append(data)
+
+    def comment(self, text):
+        if self.builder is not None:
+            self.builder.comment(text)
+        else:
+            self._stop_collecting()
+
+    def pi(self, target, data=None):
+        if self.builder is not None:
+            self.builder.pi(target, data)
+        else:
+            self._stop_collecting()
+
+    def _stop_collecting(self) -> None:
+        """Stop collecting text for the open element, whose value ends here."""
+        if self.stack and self.stack[-1] is not None:
+            self.stack[-1][4] = False
+
+    def end(self, tag):
+        if self.builder is not None:
+            self.builder.end(tag)
+            self.builder_depth -= 1
+            if self.builder_depth == 0:
+                elem = self.builder.close()
+                self.builder = None
+                self._handle_built(elem)
+            return
+
+        entry = self.stack.pop()
+        if entry is not None:
+            tag, attrib, context_ref, text, _ = entry
+            fact = self.processor._make_fact(tag, attrib, context_ref, ''.join(text) if text else None)
+            if fact is not None:
+                self.facts.append(fact)
+
+    def _handle_built(self, elem: etree.Element) -> None:
+        """Pass a completed context or unit to the processor."""
+        if elem.tag == _UNIT_TAG:
+            self.processor._process_unit_element(elem)
+            return
+        self.processor._handle_context(elem)
+        if elem.tag == _NUMERIC_CONTEXT_TAG:
+            self.processor._handle_context_unit(elem)
 
+    def close(self):
+        return self
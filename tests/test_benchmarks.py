@@ -0,0 +1,51 @@
+# test_benchmarks.py - parse-cost benchmarks, run with `pytest tests/test_benchmarks.py --benchmark-only`
+
+import pytest
+from pathlib import Path
+from lxml import etree
+from core.processor import XBRLProcessor
+
+pytest.importorskip("pytest_benchmark")
+
+NOVARTIS_INSTANCE = Path(__file__).parent.parent / "examples/Novartis-2002-11-15/Novartis-2002-11-15.xml"
+
+
+@pytest.fixture(scope="module")
+def novartis_root():
+    """Parse the Novartis instance once; the benchmarked helpers only read it."""
+    if not NOVARTIS_INSTANCE.exists():
+        pytest.skip(f"Novartis instance not found at {NOVARTIS_INSTANCE}")
+    return etree.parse(str(NOVARTIS_INSTANCE)).getroot()
+
+
+@pytest.fixture
+def loaded_processor(novartis_root):
+    """Provide a processor with the document's namespaces, contexts and units loaded."""
+    processor = XBRLProcessor()
+    processor._update_namespaces(novartis_root.nsmap)
+    processor._parse_contexts(novartis_root)
+    processor._parse_units(novartis_root)
+    return processor
+
+
+@pytest.mark.benchmark(group="parse")
+def test_bench_parse_contexts(benchmark, novartis_root):
+    """Benchmark context extraction from the Novartis tree."""
+    processor = XBRLProcessor()
+    benchmark.pedantic(processor._parse_contexts, args=(novartis_root,), rounds=20, iterations=3)
+    assert processor.contexts
+
+
+@pytest.mark.benchmark(group="parse")
+def test_bench_parse_facts(benchmark, loaded_processor, novartis_root):
+    """Benchmark fact extraction from the Novartis tree."""
+    benchmark.pedantic(loaded_processor._parse_facts, args=(novartis_root,), rounds=20, iterations=3)
+    assert loaded_processor.facts
+
+
+@pytest.mark.benchmark(group="load")
+def test_bench_load_instance(benchmark):
+    """Benchmark the streaming load of the Novartis instance."""
+    if not NOVARTIS_INSTANCE.exists():
+        pytest.skip(f"Novartis instance not found at {NOVARTIS_INSTANCE}")
+    benchmark.pedantic(lambda: XBRLProcessor().load_instance(NOVARTIS_INSTANCE), rounds=20, iterations=1)
@@ -1,55 +1,130 @@
 import pytest
 from pathlib import Path
 from datetime import datetime
+import os
 import shutil
+import io
+import csv
+import json
+import numpy as np
+import re
 from decimal import Decimal
 from lxml import etree
 from core.models import  XBRLContext, XBRLUnit, XBRLFact
-from core.processor import XBRLProcessor
+from core.processor import XBRLProcessor, parse_stream
 from core.inline_processor import iXBRLProcessor
-from core.folder_processor import  XBRLFolderProcessor
+from core.folder_processor import  XBRLFolderProcessor, FileType
 from validators.calculation_validator import CalculationValidator, CalculationRelationship
 
+# Dates shared by the fixtures and assertions
+_JAN1_2024 = datetime(2024, 1, 1)
+_DEC31_2024 = datetime(2024, 12, 31)
+
+# Shared parser for the small inline XML fixtures
+_PARSER = etree.XMLParser(collect_ids=False, resolve_entities=False, no_network=True,
+                          huge_tree=False, remove_blank_text=True)
+# iXBRL fixtures keep their whitespace, which is part of the XHTML content
+_IXBRL_PARSER = etree.XMLParser(collect_ids=False, resolve_entities=False, no_network=True,
+                                huge_tree=False)
+# Compiled once instead of translating a find() path in each test
+_XP_IX_HIDDEN = etree.XPath('.//ix:hidden', namespaces={'ix': iXBRLProcessor._DEFAULT_NAMESPACES['ix']})
+
+
+# Messages test_validation looks for, matched in a single pass
+_VALIDATION_RE = re.compile(
+    r'(?P<missing_context>missing context)|(?P<missing_unit>missing unit)|(?P<numeric_unit>numeric[^\n]*unit)',
+    re.IGNORECASE
+)
+
+# Inline fixtures, parsed once per module; the parse helpers only read them
+FACTS_XML = b"""
+<xbrl xmlns:xbrli="http://www.xbrl.org/2001/instance" 
+      xmlns:test="http://test.namespace"
+      xmlns:iso4217="http://www.xbrl.org/2003/iso4217">
+    <test:Revenue contextRef="ctx1" unitRef="usd" decimals="2" precision="INF" sign="-">1000.00</test:Revenue>
+    <test:Shares contextRef="ctx1" unitRef="shares" precision="4">500000</test:Shares>
+    <test:Ratio contextRef="ctx1" unitRef="pure" decimals="4">0.5432</test:Ratio>
+    <test:Description contextRef="ctx1">Test description with special chars: &amp; &lt; &gt;</test:Description>
+</xbrl>
+"""
 
-@pytest.fixture
-def processor():
-    """Provide a fresh XBRLProcessor instance for each test."""
+CONTEXTS_XML = b"""
+<xbrl xmlns:xbrli="http://www.xbrl.org/2001/instance"
+      xmlns:test="http://test.com/test">
+    <xbrli:context id="instant">
+        <xbrli:entity>
+            <xbrli:identifier scheme="http://test.com">TEST</xbrli:identifier>
+        </xbrli:entity>
+        <xbrli:period>
+            <xbrli:instant>2024-01-01</xbrli:instant>
+        </xbrli:period>
+    </xbrli:context>
+    <xbrli:context id="duration">
+        <xbrli:entity>
+            <xbrli:identifier scheme="http://test.com">TEST</xbrli:identifier>
+        </xbrli:entity>
+        <xbrli:period>
+            <xbrli:startDate>2024-01-01</xbrli:startDate>
+            <xbrli:endDate>2024-12-31</xbrli:endDate>
+        </xbrli:period>
+        <xbrli:scenario>
+            <test:type>Actual</test:type>
+        </xbrli:scenario>
+    </xbrli:context>
+</xbrl>
+"""
+
+
+@pytest.fixture(scope="module")
+def facts_root():
+    """Parsed FACTS_XML."""
+    return etree.fromstring(FACTS_XML, _PARSER)
+
+
+@pytest.fixture(scope="module")
+def contexts_root():
+    """Parsed CONTEXTS_XML."""
+    return etree.fromstring(CONTEXTS_XML, _PARSER)
+
+
+@pytest.fixture(scope="session")
+def _session_processor():
+    """One XBRLProcessor for the whole session, reset between tests."""
     return XBRLProcessor()
 
 
 @pytest.fixture
-def sample_contexts():
-    """Provide standard test contexts."""
+def processor(_session_processor):
+    """Provide a freshly reset XBRLProcessor for each test."""
+    _session_processor.reset()
+    return _session_processor
+
+
+def _make_sample_contexts():
+    """Build the standard test contexts; every call returns new objects."""
     return {
         'ctx1': XBRLContext(
             id='ctx1',
             entity='http://entity.com:TEST',
-            instant=datetime(2024, 1, 1)
+            instant=_JAN1_2024
         ),
         'ctx2': XBRLContext(
             id='ctx2',
             entity='http://entity.com:TEST',
-            period_start=datetime(2024, 1, 1),
-            period_end=datetime(2024, 12, 31)
+            period_start=_JAN1_2024,
+            period_end=_DEC31_2024
         )
     }
 
 
-def test_fact_parsing(processor, sample_contexts):
-    """Test comprehensive fact parsing with different types and attributes."""
-    xml = """
-    <xbrl xmlns:xbrli="http://www.xbrl.org/2001/instance" 
-          xmlns:test="http://test.namespace"
-          xmlns:iso4217="http://www.xbrl.org/2003/iso4217">
-        <test:Revenue contextRef="ctx1" unitRef="usd" decimals="2" precision="INF" sign="-">1000.00</test:Revenue>
-        <test:Shares contextRef="ctx1" unitRef="shares" precision="4">500000</test:Shares>
-        <test:Ratio contextRef="ctx1" unitRef="pure" decimals="4">0.5432</test:Ratio>
-        <test:Description contextRef="ctx1">Test description with special chars: &amp; &lt; &gt;</test:Description>
-    </xbrl>
-    """
+@pytest.fixture
+def sample_contexts():
+    """Provide fresh standard test contexts, so no test sees another's changes."""
+    return _make_sample_contexts()
+
 
-    # Setup processor
-    root = etree.fromstring(xml)
+def _setup_fact_parsing(processor, sample_contexts):
+    """Prepare a processor with the namespaces, contexts and units FACTS_XML refers to."""
     processor.namespaces['test'] = 'http://test.namespace'
     processor.contexts.update(sample_contexts)
     processor.units.update({
@@ -58,35 +133,65 @@ def test_fact_parsing(processor, sample_contexts):
         'pure': XBRLUnit(id='pure', measures=['xbrli:pure'])
     })
 
+
+@pytest.fixture(scope="module")
+def parsed_facts(facts_root):
+    """Parse FACTS_XML once into a processor used only for lookups."""
+    processor = XBRLProcessor()
+    _setup_fact_parsing(processor, _make_sample_contexts())
+    processor._parse_facts(facts_root)
+    return processor
+
+
+def test_fact_parsing(processor, sample_contexts, facts_root):
+    """Test comprehensive fact parsing with different types and attributes."""
+    _setup_fact_parsing(processor, sample_contexts)
+
     # Parse facts
-    processor._parse_facts(root)
+    namespaces_before = dict(processor.namespaces)
+    processor._parse_facts(facts_root)
+    assert processor.namespaces == namespaces_before, "Fact parsing should not modify namespaces"
 
     # Verify correct number of facts parsed
     assert len(processor.facts) == 4, "Should parse exactly 4 facts"
 
-    # Test numeric fact with sign and precision
-    revenue = next(f for f in processor.facts if f.concept == 'test:Revenue')
-    assert revenue.value == -1000.00
-    assert revenue.decimals == 2
-    assert revenue.precision == float('inf')
-    assert revenue.unit_ref == 'usd'
-
-    # Test integer fact with precision
-    shares = next(f for f in processor.facts if f.concept == 'test:Shares')
-    assert isinstance(shares.value, int)
-    assert shares.value == 500000
-    assert shares.precision == 4
-
-    # Test decimal fact
-    ratio = next(f for f in processor.facts if f.concept == 'test:Ratio')
-    assert isinstance(ratio.value, float)
-    assert ratio.value == 0.5432
-    assert ratio.decimals == 4
 
-    # Test string fact with special characters
-    desc = next(f for f in processor.facts if f.concept == 'test:Description')
-    assert desc.value == 'Test description with special chars: & < >'
-    assert desc.unit_ref is None
+@pytest.mark.parametrize("as_file_object", [False, True])
+def test_fact_parsing_from_path(processor, sample_contexts, tmp_path, as_file_object):
+    """Facts streamed from a path or file object should match those parsed from a tree."""
+    _setup_fact_parsing(processor, sample_contexts)
+    path = tmp_path / "facts.xml"
+    path.write_bytes(FACTS_XML)
+
+    processor._parse_facts(io.BytesIO(FACTS_XML) if as_file_object else path)
+    streamed = [processor._fact_to_dict(fact) for fact in processor.facts]
+    processor._parse_facts(etree.fromstring(FACTS_XML, _PARSER))
+    assert streamed == [processor._fact_to_dict(fact) for fact in processor.facts]
+
+
+@pytest.mark.parametrize("concept,attr,expected", [
+    # Numeric fact with sign and precision
+    ("test:Revenue", "value", -1000.00),
+    ("test:Revenue", "decimals", 2),
+    ("test:Revenue", "precision", float('inf')),
+    ("test:Revenue", "unit_ref", 'usd'),
+    ("test:Revenue", "is_numeric", True),
+    # Integer fact with precision
+    ("test:Shares", "value", 500000),
+    ("test:Shares", "precision", 4),
+    # Decimal fact
+    ("test:Ratio", "value", 0.5432),
+    ("test:Ratio", "decimals", 4),
+    # String fact with special characters
+    ("test:Description", "value", 'Test description with special chars: & < >'),
+    ("test:Description", "unit_ref", None),
+    ("test:Description", "is_numeric", False),
+])
+def test_fact_attributes(parsed_facts, concept, attr, expected):
+    """Test individual parsed fact attributes, including their types."""
+    actual = getattr(parsed_facts.get_fact(concept, 'ctx1'), attr)
+    assert actual == expected
+    assert type(actual) is type(expected)
 
 
 def test_validation(processor, sample_contexts):
@@ -107,87 +212,242 @@ def test_validation(processor, sample_contexts):
     # Run validation
     errors = processor.validate()
 
-    # Get both errors and warnings (from stdout)
-    import io
-    import sys
-    stdout = io.StringIO()
-    sys.stdout = stdout
-    processor.validate()
-    sys.stdout = sys.__stdout__
-    output = stdout.getvalue()
-
     # Verify specific error messages
     error_texts = '\n'.join(errors)
-    warning_texts = output
+    warning_texts = '\n'.join(processor.warnings)
 
     # Check required validations are present
-    assert 'missing context' in error_texts.lower()
-    assert 'missing unit' in error_texts.lower()
-    assert ('numeric' in warning_texts.lower() and 'unit' in warning_texts.lower()), \
-        "Should warn about non-numeric fact with unit reference"
+    error_hits = {m.lastgroup for m in _VALIDATION_RE.finditer(error_texts)}
+    warning_hits = {m.lastgroup for m in _VALIDATION_RE.finditer(warning_texts)}
+    assert {'missing_context', 'missing_unit'} <= error_hits
+    assert 'numeric_unit' in warning_hits, "Should warn about non-numeric fact with unit reference"
 
     # Count errors - should have exactly 3
     assert len(errors) == 2, f"Expected 2 errors but got {len(errors)}:\n{error_texts}"
 
-def test_context_periods(processor):
-    """Test comprehensive context period handling."""
-    xml = """
-    <xbrl xmlns:xbrli="http://www.xbrl.org/2001/instance"
-          xmlns:test="http://test.com/test">
-        <xbrli:context id="instant">
-            <xbrli:entity>
-                <xbrli:identifier scheme="http://test.com">TEST</xbrli:identifier>
-            </xbrli:entity>
-            <xbrli:period>
-                <xbrli:instant>2024-01-01</xbrli:instant>
-            </xbrli:period>
-        </xbrli:context>
-        <xbrli:context id="duration">
-            <xbrli:entity>
-                <xbrli:identifier scheme="http://test.com">TEST</xbrli:identifier>
-            </xbrli:entity>
-            <xbrli:period>
-                <xbrli:startDate>2024-01-01</xbrli:startDate>
-                <xbrli:endDate>2024-12-31</xbrli:endDate>
-            </xbrli:period>
-            <xbrli:scenario>
-                <test:type>Actual</test:type>
-            </xbrli:scenario>
-        </xbrli:context>
-    </xbrl>
-    """
 
-    root = etree.fromstring(xml)
-    processor._parse_contexts(root)
+def test_validation_follows_value_changes(processor, sample_contexts):
+    """Test that validate() judges a parsed fact by its current value."""
+    processor.contexts.update(sample_contexts)
+    processor.units['usd'] = XBRLUnit(id='usd', measures=['iso4217:USD'])
+    fact = processor._make_fact('Note', {'unitRef': 'usd'}, 'ctx1', '100')
+    processor.facts.append(fact)
+    assert fact.is_numeric
+    processor.validate()
+    assert not processor.warnings
+
+    fact.value = 'text'
+    assert not fact.is_numeric
+    processor.validate()
+    assert any(m.lastgroup == 'numeric_unit' for m in _VALIDATION_RE.finditer('\n'.join(processor.warnings)))
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_context_periods(processor, contexts_root, streamed):
+    """Test comprehensive context period handling."""
+    processor._parse_contexts(io.BytesIO(CONTEXTS_XML) if streamed else contexts_root)
 
     # Test instant context
     instant_ctx = processor.contexts['instant']
     assert instant_ctx.is_instant
     assert not instant_ctx.is_duration
-    assert instant_ctx.instant == datetime(2024, 1, 1)
+    assert instant_ctx.instant == _JAN1_2024
     assert instant_ctx.entity == 'http://test.com:TEST'
 
     # Test duration context
     duration_ctx = processor.contexts['duration']
     assert not duration_ctx.is_instant
     assert duration_ctx.is_duration
-    assert duration_ctx.period_start == datetime(2024, 1, 1)
-    assert duration_ctx.period_end == datetime(2024, 12, 31)
+    assert duration_ctx.period_start == _JAN1_2024
+    assert duration_ctx.period_end == _DEC31_2024
     assert duration_ctx.scenario is not None
     assert 'type' in duration_ctx.scenario['segments'][0]
 
 
+def test_context_scenario_argument():
+    """Test that contexts accept a scenario dict or its serialized element."""
+    segments = {'segments': [{'member': 'A'}]}
+    assert XBRLContext(id='c', entity='e', scenario=segments).scenario == segments
+    assert XBRLContext(id='c', entity='e', scenario=b'<scenario><member>A</member></scenario>').scenario == segments
+    assert XBRLContext(id='c', entity='e').scenario is None
+
+
+def test_reset(sample_contexts):
+    """Test that reset returns a used processor to its initial state."""
+    fresh = XBRLProcessor()
+    used = XBRLProcessor()
+    facts = used.facts
+    used.namespaces['test'] = 'http://test.namespace'
+    used.contexts.update(sample_contexts)
+    used.units['usd'] = XBRLUnit(id='usd', measures=['iso4217:USD'])
+    used.facts.append(XBRLFact(concept='test:Revenue', value=1, context_ref='ctx1'))
+    used.calculation_validator = CalculationValidator()
+
+    used.reset()
+
+    assert used.namespaces == fresh.namespaces
+    assert not used.contexts and not used.units and not used.facts
+    assert used.facts is facts, "Containers should be cleared in place"
+    assert not hasattr(used, 'calculation_validator')
+    assert used._get_concept_name(etree.Element('{http://test.namespace}Revenue')) == 'Revenue'
+
+
+def test_validator_reset(sample_calculation_tree):
+    """Test that reset empties a validator that has loaded a linkbase."""
+    used = CalculationValidator()
+    used.load_calculation_linkbase(sample_calculation_tree)
+    used.namespaces['test'] = 'http://test.namespace'
+
+    used.reset()
+
+    assert not used.calc_relationships and not used.calculation_roles
+    assert used.namespaces == CalculationValidator().namespaces
+
+
+def test_facts_by_concept(processor):
+    """Test that the concept index follows appends and list replacement."""
+    revenue = XBRLFact(concept='test:Revenue', value=1, context_ref='ctx1')
+    processor.facts.append(revenue)
+    assert processor.facts_by_concept == {'test:Revenue': [revenue]}
+    assert processor.facts_by_concept is processor.facts_by_concept, "Index should be kept between reads"
+
+    shares = XBRLFact(concept='test:Shares', value=2, context_ref='ctx1')
+    processor.facts.append(shares)
+    assert processor.facts_by_concept['test:Shares'] == [shares]
+
+    processor.facts = [shares]
+    assert processor.facts_by_concept == {'test:Shares': [shares]}
+
+    duplicate = XBRLFact(concept='test:Shares', value=3, context_ref='ctx1')
+    processor.facts.append(duplicate)
+    assert processor.facts_by_key == {('test:Shares', 'ctx1'): shares}
+    assert processor.get_fact('test:Shares') is shares
+    assert processor.get_fact('test:Shares', 'ctx1') is shares
+    assert processor.get_facts('test:Shares') == [shares, duplicate]
+    assert processor.get_fact('test:Shares', 'ctx2') is None
+    assert processor.get_fact('test:Revenue') is None
+    assert processor.get_facts('test:Revenue') == []
+
+
+def test_facts_replaced_in_place(processor):
+    """Test that lookups see a fact replaced without changing the list length."""
+    revenue = XBRLFact(concept='test:Revenue', value=1, context_ref='ctx1')
+    shares = XBRLFact(concept='test:Shares', value=2, context_ref='ctx1')
+    processor.facts.append(revenue)
+    assert processor.get_fact('test:Revenue') is revenue
+
+    processor.facts[0] = shares
+    assert processor.get_fact('test:Revenue') is None
+    assert processor.get_fact('test:Shares', 'ctx1') is shares
+    assert processor.get_facts('test:Shares') == [shares]
+    assert processor.facts_by_concept == {'test:Shares': [shares]}
+    assert processor.facts_by_key == {('test:Shares', 'ctx1'): shares}
+
+
+def test_numeric_values(processor):
+    """Test that numeric_values lines up with facts and marks text as NaN."""
+    processor.facts.extend([
+        XBRLFact(concept='test:Revenue', value=1000, context_ref='ctx1'),
+        XBRLFact(concept='test:Description', value='text', context_ref='ctx1'),
+        XBRLFact(concept='test:Ratio', value=0.5, context_ref='ctx1'),
+    ])
+    values = processor.numeric_values
+    assert values[0] == 1000 and values[2] == 0.5
+    assert np.isnan(values[1])
+    assert processor.concept_names.tolist() == ['test:Revenue', 'test:Description', 'test:Ratio']
+
+    # The array follows values changed after it was first read
+    processor.facts[0].value = 400
+    processor.facts[2].value = 'n/a'
+    values = processor.numeric_values
+    assert values[0] == 400
+    assert np.isnan(values[2])
+
+
+def test_parse_date_formats(processor):
+    """Test XBRL date parsing for both layouts and malformed input."""
+    assert processor._parse_date("2024-01-01") == _JAN1_2024
+    assert processor._parse_date(" 2024-01-01T12:30:15 ") == datetime(2024, 1, 1, 12, 30, 15)
+    assert processor._parse_date("2024-1-1") == _JAN1_2024
+    assert processor._parse_date("") is None
+
+    with pytest.raises(ValueError, match="Unable to parse date '2024-13-01'"):
+        processor._parse_date("2024-13-01")
+
+
+@pytest.mark.parametrize("revenue_text,revenue", [
+    ("1000", 1000),
+    # Only the text before a comment or processing instruction is the value
+    ("12<!-- note -->34", 12),
+    ("12<?note x?>34", 12),
+])
+@pytest.mark.parametrize("loader", ["load_instance", "load_instance_streaming"])
+def test_load_instance_facts_before_contexts(processor, tmp_path, loader, revenue_text, revenue):
+    """Test streamed loading when facts precede their contexts and units."""
+    xml = f"""<?xml version="1.0"?>
+    <group xmlns="http://www.xbrl.org/2001/instance"
+           xmlns:test="http://test.com/test">
+        <test:Revenue numericContext="c1">{revenue_text}</test:Revenue>
+        <test:Orphan numericContext="missing">5</test:Orphan>
+        <numericContext id="c1" precision="18" cwa="false">
+            <entity>
+                <identifier scheme="http://test.com">TEST</identifier>
+            </entity>
+            <period>
+                <instant>2024-01-01</instant>
+            </period>
+            <unit>
+                <measure>iso4217:EUR</measure>
+            </unit>
+        </numericContext>
+    </group>
+    """
+    instance = tmp_path / "instance.xml"
+    instance.write_text(xml.strip())
+
+    getattr(processor, loader)(instance)
+
+    assert processor.contexts['c1'].instant == _JAN1_2024
+    assert processor.units['c1'].measures == ['iso4217:EUR']
+    assert len(processor.facts) == 1
+    assert processor.facts[0].concept == 'test:Revenue'
+    assert processor.facts[0].value == revenue
+    assert processor.facts[0].unit_ref == 'c1'
+
+
+def _flatten_measures(units):
+    """Collect every measure used by a set of units, for membership checks."""
+    return frozenset(m for unit in units.values() for m in unit.measures)
+
+
+NOVARTIS_FOLDER = Path(__file__).parent.parent / "examples/Novartis-2002-11-15"
+
+
+@pytest.fixture(scope="session")
+def novartis_path():
+    """Resolve the bundled Novartis instance once, skipping if it is absent."""
+    instance = NOVARTIS_FOLDER / "Novartis-2002-11-15.xml"
+    if not instance.exists():
+        pytest.skip(f"Novartis instance not found at {instance}")
+    return instance
+
+
+@pytest.fixture(scope="session")
+def processed_folder(novartis_folder):
+    """Process the Novartis test folder once for read-only integration tests."""
+    processor = XBRLFolderProcessor()
+    processor.process_folder(novartis_folder)
+    return processor
+
+
 @pytest.mark.integration
-def test_real_file_loading(folder_processor):
+def test_real_file_loading(processed_folder, novartis_path):
     """Test processing of real XBRL files with comprehensive validation."""
-    test_dir = Path(__file__).parent.parent
-    novartis_folder = test_dir / "examples/Novartis-2002-11-15"
-
-    if not novartis_folder.exists():
-        pytest.skip(f"Novartis test folder not found at {novartis_folder}")
+    folder_processor = processed_folder
 
-    # Process the folder
-    folder_processor.process_folder(novartis_folder)
+    # Contexts streamed straight from the file match the loaded ones
+    streamed = XBRLProcessor()
+    streamed._parse_contexts(novartis_path)
+    assert streamed.contexts == folder_processor.contexts
 
     # Test context loading
     assert len(folder_processor.contexts) > 0, "No contexts were loaded"
@@ -196,24 +456,23 @@ def test_real_file_loading(folder_processor):
 
     # Test unit loading
     assert len(folder_processor.units) > 0, "No units were loaded"
-    chf_units = [u for u in folder_processor.units.values()
-                 if any('CHF' in m for m in u.measures)]
-    assert len(chf_units) > 0, "Expected CHF unit not found"
+    measures = _flatten_measures(folder_processor.units)
+    assert any('CHF' in m for m in measures), "Expected CHF unit not found"
 
     # Test fact loading
     assert len(folder_processor.facts) > 0, "No facts were loaded"
 
-    # Test specific fact values
-    revenue_facts = [f for f in folder_processor.facts
-                     if 'Revenue' in f.concept]
+    # Test specific fact values, matching concept names once each
+    revenue_facts = [f for concept, facts in folder_processor.facts_by_concept.items()
+                     if 'Revenue' in concept for f in facts]
     assert len(revenue_facts) > 0, "No revenue facts found"
-    assert all(isinstance(f.value, (int, float)) for f in revenue_facts), \
+    revenue_ids = np.flatnonzero(np.char.find(folder_processor.concept_names, 'Revenue') >= 0)
+    assert len(revenue_ids) == len(revenue_facts)
+    assert not np.isnan(folder_processor.numeric_values[revenue_ids]).any(), \
         "Revenue facts should be numeric"
 
     # Add specific data validation
-    revenue_2001 = next((f for f in revenue_facts
-                         if f.context_ref == 'Group2001ForPeriod'
-                         and 'RevenueFunction' in f.concept), None)
+    revenue_2001 = folder_processor.get_fact('iascf-pfs:RevenueFunction', 'Group2001ForPeriod')
     assert revenue_2001 is not None, "2001 revenue not found"
     assert revenue_2001.value == 32038000000, "Unexpected 2001 revenue value"
 
@@ -222,15 +481,41 @@ def test_real_file_loading(folder_processor):
     assert len(errors) == 0, f"Validation errors found:\n" + "\n".join(errors)
 
 
-@pytest.fixture
-def folder_processor():
-    """Provide a fresh XBRLFolderProcessor instance for each test."""
+@pytest.mark.integration
+@pytest.mark.parametrize("loader", ["load_instance", "load_instance_streaming"])
+def test_streaming_load(novartis_path, loader):
+    """Test that the streaming loaders match a full-tree parse of the Novartis instance."""
+    instance = novartis_path
+    tree_processor = XBRLProcessor()
+    root = etree.parse(str(instance)).getroot()
+    tree_processor._update_namespaces(root.nsmap)
+    tree_processor._parse_contexts(root)
+    tree_processor._parse_units(root)
+    tree_processor._parse_facts(root)
+
+    streamed = XBRLProcessor()
+    getattr(streamed, loader)(instance)
+
+    assert len(streamed.facts) == len(tree_processor.facts) > 0
+    assert streamed.to_dict() == tree_processor.to_dict()
+
+
+@pytest.fixture(scope="session")
+def _session_folder_processor():
+    """One XBRLFolderProcessor for the whole session, reset between tests."""
     return XBRLFolderProcessor()
 
 
 @pytest.fixture
-def novartis_folder(tmp_path):
-    """Create a temporary test folder with Novartis files."""
+def folder_processor(_session_folder_processor):
+    """Provide a freshly reset XBRLFolderProcessor for each test."""
+    _session_folder_processor.reset()
+    return _session_folder_processor
+
+
+@pytest.fixture(scope="session")
+def novartis_folder(tmp_path_factory):
+    """Create a temporary test folder with Novartis files, once per session."""
     # First try the direct parent directory
     test_dir = Path(__file__).parent.parent
     source_folder = test_dir / "examples/Novartis-2002-11-15"
@@ -240,7 +525,7 @@ def novartis_folder(tmp_path):
         source_folder = test_dir / "tests" / "Novartis-2002-11-15"
 
     # Create the temporary folder
-    novartis_folder = tmp_path / "Novartis-2002-11-15"
+    novartis_folder = tmp_path_factory.mktemp("novartis") / "Novartis-2002-11-15"
     novartis_folder.mkdir()
 
     # Define the expected Novartis files
@@ -273,12 +558,13 @@ def novartis_folder(tmp_path):
         print(f"Warning: Source folder not found at {source_folder}, created minimal test file")
         return novartis_folder
 
-    # Copy files that exist
+    # Copy files that exist, checking names against one directory listing
+    with os.scandir(source_folder) as entries:
+        present = {entry.name: entry.path for entry in entries}
     files_copied = 0
     for filename in expected_files:
-        source_file = source_folder / filename
-        if source_file.exists():
-            shutil.copy2(source_file, novartis_folder / filename)
+        if filename in present:
+            shutil.copyfile(present[filename], novartis_folder / filename)
             files_copied += 1
         else:
             print(f"Warning: Source file {filename} not found")
@@ -308,23 +594,27 @@ def test_file_discovery(folder_processor, novartis_folder):
     for name, file in folder_processor.discovered_files.items():
         print(f"  {name}: {file.file_type}")
 
-    discovered_types = {f.file_type for f in folder_processor.discovered_files.values()}
     assert len(folder_processor.discovered_files) > 0, "No files were discovered"
-    assert 'instance' in discovered_types, "No instance document found"
+    assert folder_processor.discovered_type_mask & FileType.INSTANCE, "No instance document found"
 
 
-def test_full_folder_processing(folder_processor, novartis_folder):
+def test_full_folder_processing(processed_folder, novartis_folder):
     """Test end-to-end folder processing."""
     print("\nDebug: Files in test folder:")
     for file in novartis_folder.iterdir():
         print(f"  {file.name}")
 
-    folder_processor.process_folder(novartis_folder)
+    folder_processor = processed_folder
 
     # Basic data presence checks
     assert len(folder_processor.contexts) > 0, "No contexts were loaded"
     assert len(folder_processor.facts) > 0, "No facts were loaded"
 
+    # Every fact element seen by a streaming pass over the instance was loaded
+    instance = novartis_folder / "Novartis-2002-11-15.xml"
+    fact_count = sum(1 for elem in parse_stream(instance) if elem.get('contextRef') or elem.get('numericContext'))
+    assert fact_count == len(folder_processor.facts)
+
 
 def test_invalid_folder_handling(folder_processor, tmp_path):
     """Test handling of invalid folders and files."""
@@ -338,33 +628,83 @@ def test_invalid_folder_handling(folder_processor, tmp_path):
         folder_processor.process_folder(tmp_path / "nonexistent")
 
 
-def test_export_functionality(folder_processor, novartis_folder, tmp_path):
+def test_single_file_folder_runs_inline(folder_processor, novartis_folder, tmp_path, monkeypatch):
+    """A folder holding only the instance is processed without a thread pool."""
+    single = tmp_path / "single"
+    single.mkdir()
+    shutil.copy(novartis_folder / "Novartis-2002-11-15.xml", single)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("thread pool created for a single file")
+    monkeypatch.setattr('core.folder_processor.ThreadPoolExecutor', no_pool)
+
+    folder_processor.process_folder(single)
+    assert folder_processor.facts
+
+
+def test_export_functionality(processed_folder, tmp_path):
     """Test export functionality with folder processor."""
-    folder_processor.process_folder(novartis_folder)
+    folder_processor = processed_folder
 
     # Test JSON export
     json_path = tmp_path / "output.json"
     folder_processor.export_to_json(json_path)
     assert json_path.exists()
     assert json_path.stat().st_size > 0, "JSON file is empty"
+    assert json_path.read_text() == json.dumps(folder_processor.base_processor.to_dict(),
+                                               indent=2, default=str)
 
     # Test CSV export
     csv_path = tmp_path / "output.csv"
     folder_processor.export_to_csv(csv_path)
-    assert csv_path.exists()
-    assert csv_path.stat().st_size > 0, "CSV file is empty"
+    with csv_path.open(newline='') as f:
+        header, *rows = csv.reader(f)
+    assert header == ['concept', 'value', 'context_id', 'unit', 'entity',
+                      'period_start', 'period_end', 'instant']
+    assert len(rows) == len(folder_processor.facts)
+
+    # The filing mixes int and float values, so ints are written as floats,
+    # and midnight dates are written without a time, as the pandas export did
+    assert rows[0] == ['iascf-pfs:RevenueFunction', '32038000000.0', 'Group2001ForPeriod', 'iso4217:CHF',
+                       'http://www.novartis.com/group:Novartis Group', '', '2001-12-31', '']
+
+
+@pytest.mark.parametrize("values,expected", [
+    ([1000, 2000], ['1000', '2000']),
+    ([1000, 0.5], ['1000.0', '0.5']),
+    ([1000, None], ['1000.0', '']),
+    ([1000, 'text'], ['1000', 'text']),
+    ([2**64, 0.5], [str(2**64), '0.5']),
+])
+def test_csv_value_cells(processor, sample_contexts, tmp_path, values, expected):
+    """Test how value cells are written for each mix of value types."""
+    processor.contexts.update(sample_contexts)
+    processor.facts = [XBRLFact(concept='test:Value', value=value, context_ref='ctx1') for value in values]
+    csv_path = tmp_path / "values.csv"
+    processor.export_to_csv(csv_path)
+    with csv_path.open(newline='') as f:
+        _, *rows = csv.reader(f)
+    assert [row[1] for row in rows] == expected
+    assert rows[0][7] == '2024-01-01'
+
+
+@pytest.fixture(scope="session")
+def _session_ixbrl_processor():
+    """One iXBRLProcessor for the whole session, reset between tests."""
+    return iXBRLProcessor()
 
 
 @pytest.fixture
-def ixbrl_processor():
-    """Provide a fresh iXBRLProcessor instance for each test."""
-    return iXBRLProcessor()
+def ixbrl_processor(_session_ixbrl_processor):
+    """Provide a freshly reset iXBRLProcessor for each test."""
+    _session_ixbrl_processor.reset()
+    return _session_ixbrl_processor
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_ixbrl():
     """Provide sample iXBRL content with modern features."""
-    xml_str = """<?xml version="1.0" encoding="UTF-8"?>
+    xml_bytes = b"""<?xml version="1.0" encoding="UTF-8"?>
 <html xmlns="http://www.w3.org/1999/xhtml" 
       xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"
       xmlns:ixt="http://www.xbrl.org/inlineXBRL/transformation/2020-02-12"
@@ -416,14 +756,20 @@ def sample_ixbrl():
         </div>
     </body>
 </html>"""
-    return xml_str.encode('utf-8')
+    return xml_bytes
+
 
+@pytest.fixture(scope="session")
+def sample_ixbrl_root(sample_ixbrl):
+    """Parsed sample_ixbrl, shared by tests that only read it."""
+    return etree.fromstring(sample_ixbrl, _IXBRL_PARSER)
 
-def test_ixbrl_hidden_section_parsing(ixbrl_processor, sample_ixbrl):
+
+def test_ixbrl_hidden_section_parsing(ixbrl_processor, sample_ixbrl_root):
     """Test parsing of the hidden section containing contexts and units."""
-    root = etree.fromstring(sample_ixbrl)
-    hidden = root.find('.//ix:hidden', ixbrl_processor.namespaces)
-    assert hidden is not None
+    matches = _XP_IX_HIDDEN(sample_ixbrl_root)
+    assert matches
+    hidden = matches[0]
 
     ixbrl_processor._parse_hidden_section(hidden)
 
@@ -440,84 +786,76 @@ def test_ixbrl_hidden_section_parsing(ixbrl_processor, sample_ixbrl):
     assert 'iso4217:USD' in usd_unit.measures
 
 
-def test_ixbrl_transformations(ixbrl_processor):
-    """Test various iXBRL transformation rules."""
+TRANSFORM_CASES = [
+    ('1,234.56', 'ixt:numdotdecimal', '1234.56'),
+    ('1.234,56', 'ixt:numcommadot', '1234.56'),
+    ('(1234.56)', 'ixt:numdotdecimal', '-1234.56'),
+    ('12.5%', 'ixt:numwordsen', '12.5'),
+    ('$1,234.56', 'ixt:numdotdecimal', '1234.56'),
+    ('€1.234,56', 'ixt:numcommadot', '1234.56'),
+    ('123.456.789,01', 'ixt:numcommadot', '123456789.01'),
+    ('(123,456.78)', 'ixt:numdotdecimal', '-123456.78')
+]
+
+SCALE_CASES = [
+    # (input value, scale, format, expected result)
+    ('1000', '3', 'ixt:numdotdecimal', '1000000'),
+    ('1000', '-3', 'ixt:numdotdecimal', '1'),
+    ('1234.5', '6', 'ixt:numdotdecimal', '1234500000'),
+    ('0.001234', '-3', 'ixt:numdotdecimal', '0.000001234'),
+    # Add some edge cases
+    ('0', '3', 'ixt:numdotdecimal', '0'),
+    ('-1000', '3', 'ixt:numdotdecimal', '-1000000'),
+    ('1.23456', '-2', 'ixt:numdotdecimal', '0.0123456')
+]
 
-    def check_transform(input_val, format_type, expected):
-        elem = etree.Element(f'{{{ixbrl_processor.namespaces["ix"]}}}nonFraction',
-                             format=format_type,
-                             name="test:value",
-                             contextRef="ctx1")
-        elem.text = input_val
-        fact = ixbrl_processor._process_ixbrl_fact(elem)
-        assert str(fact.value) == expected, f"Transform {format_type} failed for {input_val}"
-
-    test_cases = [
-        ('1,234.56', 'ixt:numdotdecimal', '1234.56'),
-        ('1.234,56', 'ixt:numcommadot', '1234.56'),
-        ('(1234.56)', 'ixt:numdotdecimal', '-1234.56'),
-        ('12.5%', 'ixt:numwordsen', '12.5'),
-        ('$1,234.56', 'ixt:numdotdecimal', '1234.56'),
-        ('€1.234,56', 'ixt:numcommadot', '1234.56'),
-        ('123.456.789,01', 'ixt:numcommadot', '123456789.01'),
-        ('(123,456.78)', 'ixt:numdotdecimal', '-123456.78')
-    ]
 
-    for input_val, format_type, expected in test_cases:
-        check_transform(input_val, format_type, expected)
+_IX_NONFRACTION_TAG = f'{{{iXBRLProcessor._DEFAULT_NAMESPACES["ix"]}}}nonFraction'
 
 
-def test_ixbrl_scale_handling(ixbrl_processor):
+def _nonfraction(text, **attrs):
+    """Build an ix:nonFraction test:value fact in context ctx1."""
+    elem = etree.Element(_IX_NONFRACTION_TAG, name="test:value", contextRef="ctx1", **attrs)
+    elem.text = text
+    return elem
+
+
+@pytest.mark.parametrize("input_val,format_type,expected", TRANSFORM_CASES)
+def test_ixbrl_transformations(ixbrl_processor, input_val, format_type, expected):
+    """Test various iXBRL transformation rules."""
+    fact = ixbrl_processor._process_ixbrl_fact(_nonfraction(input_val, format=format_type))
+    assert str(fact.value) == expected, f"Transform {format_type} failed for {input_val}"
+
+
+@pytest.mark.parametrize("value,scale,format_type,expected", SCALE_CASES)
+def test_ixbrl_scale_handling(ixbrl_processor, value, scale, format_type, expected):
     """Test handling of scale factors in iXBRL facts."""
-    test_cases = [
-        # (input value, scale, format, expected result)
-        ('1000', '3', 'ixt:numdotdecimal', '1000000'),
-        ('1000', '-3', 'ixt:numdotdecimal', '1'),
-        ('1234.5', '6', 'ixt:numdotdecimal', '1234500000'),
-        ('0.001234', '-3', 'ixt:numdotdecimal', '0.000001234'),
-        # Add some edge cases
-        ('0', '3', 'ixt:numdotdecimal', '0'),
-        ('-1000', '3', 'ixt:numdotdecimal', '-1000000'),
-        ('1.23456', '-2', 'ixt:numdotdecimal', '0.0123456')
-    ]
+    fact = ixbrl_processor._process_ixbrl_fact(_nonfraction(value, scale=scale, format=format_type))
 
-    for value, scale, format_type, expected in test_cases:
-        # Create test element
-        elem = etree.Element(
-            f'{{{ixbrl_processor.namespaces["ix"]}}}nonFraction',
-            name="test:value",
-            contextRef="ctx1",
-            scale=scale,
-            format=format_type
-        )
-        elem.text = value
+    # Convert both expected and actual to Decimal for comparison
+    expected_decimal = Decimal(expected)
+    actual_decimal = Decimal(str(fact.value))
 
-        # Process the fact
-        fact = ixbrl_processor._process_ixbrl_fact(elem)
+    assert actual_decimal == expected_decimal, \
+        f"Scale {scale} failed for {value}. Expected {expected}, got {fact.value}"
 
-        # Convert both expected and actual to Decimal for comparison
-        expected_decimal = Decimal(expected)
-        actual_decimal = Decimal(str(fact.value))
 
-        assert actual_decimal == expected_decimal, \
-            f"Scale {scale} failed for {value}. Expected {expected}, got {fact.value}"
+MALFORMED_IXBRL_CASES = [
+    b'<ix:nonFraction xmlns:ix="http://www.xbrl.org/2013/inlineXBRL" scale="invalid">1000</ix:nonFraction>',
+    b'<ix:nonFraction xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">1000</ix:nonFraction>',
+    b'<ix:nonFraction xmlns:ix="http://www.xbrl.org/2013/inlineXBRL" format="invalid">1000</ix:nonFraction>'
+]
 
 
-def test_ixbrl_error_handling(ixbrl_processor):
+@pytest.mark.parametrize("xml", MALFORMED_IXBRL_CASES)
+def test_ixbrl_error_handling(ixbrl_processor, xml):
     """Test error handling for malformed iXBRL content."""
-    malformed_cases = [
-        '<ix:nonFraction xmlns:ix="http://www.xbrl.org/2013/inlineXBRL" scale="invalid">1000</ix:nonFraction>',
-        '<ix:nonFraction xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">1000</ix:nonFraction>',
-        '<ix:nonFraction xmlns:ix="http://www.xbrl.org/2013/inlineXBRL" format="invalid">1000</ix:nonFraction>'
-    ]
-
-    for xml in malformed_cases:
-        try:
-            elem = etree.fromstring(xml.encode('utf-8'))
-            fact = ixbrl_processor._process_ixbrl_fact(elem)
-            assert fact is None or fact.value is None, f"Should handle malformed element: {xml}"
-        except (etree.XMLSyntaxError, ValueError):
-            continue
+    try:
+        elem = etree.fromstring(xml, _IXBRL_PARSER)
+        fact = ixbrl_processor._process_ixbrl_fact(elem)
+    except (etree.XMLSyntaxError, ValueError):
+        return
+    assert fact is None or fact.value is None, f"Should handle malformed element: {xml}"
 
 
 @pytest.mark.integration
@@ -536,14 +874,12 @@ def test_full_ixbrl_document_processing(ixbrl_processor, tmp_path, sample_ixbrl)
     assert len(ixbrl_processor.facts) > 0, "No facts loaded"
 
     # Test specific fact values
-    facts = {f.concept: f for f in ixbrl_processor.facts}
-
-    assert 'us-gaap:Revenue' in facts
-    revenue = facts['us-gaap:Revenue']
+    revenue = ixbrl_processor.get_fact('us-gaap:Revenue')
+    assert revenue is not None
     assert Decimal(revenue.value) == Decimal('386017000000')
 
-    assert 'dei:EntityRegistrantName' in facts
-    company = facts['dei:EntityRegistrantName']
+    company = ixbrl_processor.get_fact('dei:EntityRegistrantName')
+    assert company is not None
     assert company.value == 'Meta Platforms, Inc.'
     assert company.unit_ref is None
 
@@ -563,7 +899,7 @@ def test_nested_ixbrl_facts(ixbrl_processor):
         </body>
     </html>"""
 
-    root = etree.fromstring(nested_xml)
+    root = etree.fromstring(nested_xml, _IXBRL_PARSER)
     facts = list(ixbrl_processor._parse_ixbrl_facts(root))
 
     # Should extract all facts
@@ -572,15 +908,22 @@ def test_nested_ixbrl_facts(ixbrl_processor):
     assert concepts == {'test:total', 'test:part1', 'test:part2'}
 
 
-@pytest.fixture
-def validator():
+@pytest.fixture(scope="session")
+def _session_validator():
+    """One CalculationValidator for the whole session, reset between tests."""
     return CalculationValidator()
 
 
 @pytest.fixture
+def validator(_session_validator):
+    _session_validator.reset()
+    return _session_validator
+
+
+@pytest.fixture(scope="session")
 def sample_calculation_xml():
     """Create a sample calculation linkbase file."""
-    return """<?xml version="1.0" encoding="UTF-8"?>
+    return b"""<?xml version="1.0" encoding="UTF-8"?>
 <link:linkbase xmlns:link="http://www.xbrl.org/2003/linkbase" 
                xmlns:xlink="http://www.w3.org/1999/xlink">
     <link:roleRef roleURI="http://example.com/roles/net-income" 
@@ -615,13 +958,22 @@ def sample_calculation_xml():
 """
 
 
-def test_load_calculation_linkbase(validator, sample_calculation_xml, tmp_path):
-    # Create temporary calculation file
-    calc_file = tmp_path / "calculation.xml"
-    calc_file.write_text(sample_calculation_xml)
+@pytest.fixture(scope="session")
+def sample_calculation_tree(sample_calculation_xml):
+    """Parsed sample_calculation_xml, shared by tests that only read it."""
+    return etree.ElementTree(etree.fromstring(sample_calculation_xml, _PARSER))
 
-    # Load the calculation linkbase
-    validator.load_calculation_linkbase(str(calc_file))
+
+@pytest.mark.parametrize("from_file", [True, False])
+def test_load_calculation_linkbase(validator, sample_calculation_xml, sample_calculation_tree,
+                                   tmp_path, from_file):
+    # Load the calculation linkbase from a file, or from the parsed tree
+    if from_file:
+        calc_file = tmp_path / "calculation.xml"
+        calc_file.write_bytes(sample_calculation_xml)
+        validator.load_calculation_linkbase(str(calc_file))
+    else:
+        validator.load_calculation_linkbase(sample_calculation_tree)
 
     # Verify roles were loaded
     assert "http://example.com/roles/net-income" in validator.calculation_roles
@@ -746,10 +1098,10 @@ def test_rounding_precision(validator):
     assert not errors, "Small rounding differences should be tolerated"
 
 
-def test_calculation_integration(processor, tmp_path):
+def test_calculation_integration(processor):
     """Test integration of calculation validation in the main processor."""
     # Create test calculation linkbase
-    calc_xml = """<?xml version="1.0" encoding="UTF-8"?>
+    calc_xml = b"""<?xml version="1.0" encoding="UTF-8"?>
     <link:linkbase xmlns:link="http://www.xbrl.org/2003/linkbase" 
                    xmlns:xlink="http://www.w3.org/1999/xlink">
         <link:calculationLink xlink:type="extended" 
@@ -777,19 +1129,16 @@ def test_calculation_integration(processor, tmp_path):
     </link:linkbase>
     """
 
-    calc_file = tmp_path / "calculation.xml"
-    calc_file.write_text(calc_xml)
-
     # Load the calculation linkbase
-    processor.calculation_tree = etree.parse(str(calc_file))
+    processor.calculation_tree = etree.ElementTree(etree.fromstring(calc_xml, _PARSER))
     processor._process_calculation_links()
 
     # Add test facts
     test_context = XBRLContext(
         id="ctx1",
         entity="test",
-        period_start=datetime(2024, 1, 1),
-        period_end=datetime(2024, 12, 31)
+        period_start=_JAN1_2024,
+        period_end=_DEC31_2024
     )
     processor.contexts["ctx1"] = test_context
 
@@ -811,7 +1160,11 @@ def test_calculation_integration(processor, tmp_path):
     # Test calculation summary
     summary = processor.get_calculation_summary()
     assert summary, "Should generate calculation summary"
-    assert any("NetIncome" in str(s) for s in summary.values()), "Summary should include NetIncome"
+    net_income_summary = processor.find_summary_by_concept("NetIncome")
+    assert net_income_summary, "Summary should include NetIncome"
+    assert "\nNetIncome:" in next(iter(net_income_summary.values()))
+    assert processor.find_summary_by_concept("Revenue") == net_income_summary
+    assert processor.find_summary_by_concept("Unknown") == {}
 
 
 def test_calculation_with_missing_facts(processor, tmp_path):
@@ -853,7 +1206,7 @@ def test_calculation_with_missing_facts(processor, tmp_path):
     processor.contexts["ctx1"] = XBRLContext(
         id="ctx1",
         entity="test",
-        instant=datetime(2024, 12, 31)
+        instant=_DEC31_2024
     )
 
     # Add incomplete facts
@@ -901,7 +1254,7 @@ def test_calculation_with_non_numeric_facts(processor, tmp_path):
     processor.contexts["ctx1"] = XBRLContext(
         id="ctx1",
         entity="test",
-        instant=datetime(2024, 12, 31)
+        instant=_DEC31_2024
     )
 
     # Add facts including non-numeric
@@ -0,0 +1,54 @@
+"""Numeric kernels for calculation screening.
+
+The weighted-sum loop in screen_sums is compiled with numba when it is
+installed. Without numba the same sums come from np.bincount, so numba is an
+optional speed-up and never a requirement.
+"""
+from typing import Tuple
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _screen_sums_numpy(offsets: np.ndarray, rel_parents: np.ndarray, rel_children: np.ndarray,
+                       weights: np.ndarray, values: np.ndarray,
+                       present: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-parent weighted sums, sums of absolute terms and missing-child counts."""
+    n_parents = offsets.size - 1
+    terms = weights * values[rel_children]
+    sums = np.bincount(rel_parents, weights=terms, minlength=n_parents)
+    magnitudes = np.bincount(rel_parents, weights=np.abs(terms), minlength=n_parents)
+    n_missing = np.bincount(rel_parents[~present[rel_children]], minlength=n_parents)
+    return sums, magnitudes, n_missing
+
+
+if njit is not None:
+    @njit(cache=True, error_model='numpy', boundscheck=False)
+    def _screen_sums_jit(offsets, rel_parents, rel_children, weights, values, present):
+        n_parents = offsets.size - 1
+        sums = np.zeros(n_parents)
+        magnitudes = np.zeros(n_parents)
+        n_missing = np.zeros(n_parents, dtype=np.intp)
+        for i in range(n_parents):
+            total = 0.0
+            magnitude = 0.0
+            missing = 0
+            # Terms are added in relationship order, as np.bincount does
+            for j in range(offsets[i], offsets[i + 1]):
+                child = rel_children[j]
+                term = weights[j] * values[child]
+                total += term
+                magnitude += abs(term)
+                if not present[child]:
+                    missing += 1
+            sums[i] = total
+            magnitudes[i] = magnitude
+            n_missing[i] = missing
+        return sums, magnitudes, n_missing
+
+    screen_sums = _screen_sums_jit
+else:
+    screen_sums = _screen_sums_numpy
@@ -2,9 +2,30 @@ from decimal import Decimal
 from typing import Dict, List, Set, Tuple, Optional, Union
 from dataclasses import dataclass
 from lxml import etree
+from types import MappingProxyType
+import numpy as np
+from core.models import _LINKBASE_PARSER_OPTIONS
+from validators._kernels import screen_sums
 
+# Arc weights are almost always "1" or "-1", so each distinct string is
+# converted once and the (immutable) Decimal shared between relationships
+_WEIGHT_CACHE: Dict[str, Decimal] = {}
 
-@dataclass
+
+def _to_decimal(value: Union[Decimal, int, float]) -> Decimal:
+    """Return value as a Decimal, converting ints and floats via their str()."""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _weight(value: str) -> Decimal:
+    """Return the Decimal for a calculationArc weight attribute."""
+    weight = _WEIGHT_CACHE.get(value)
+    if weight is None:
+        weight = _WEIGHT_CACHE[value] = Decimal(value)
+    return weight
+
+
+@dataclass(slots=True)
 class CalculationRelationship:
     parent: str  # Parent concept
     child: str  # Child concept
@@ -13,149 +34,270 @@ class CalculationRelationship:
     role: str  # Extended role for grouping calculations
 
 
+@dataclass(slots=True)
+class _CalculationArrays:
+    parents: List[str]  # Parent concepts in calc_relationships order
+    concepts: List[str]  # Every parent and child concept, indexed by the arrays below
+    parent_ids: np.ndarray  # Concept index of each parent
+    offsets: np.ndarray  # Parent i owns relationships offsets[i]:offsets[i + 1]
+    rel_parents: np.ndarray  # Parent position of each relationship
+    rel_children: np.ndarray  # Concept index of each relationship's child
+    weights: np.ndarray  # Weight of each relationship as float64
+
+
 class CalculationValidator:
+    _DEFAULT_NAMESPACES = MappingProxyType({
+        'link': 'http://www.xbrl.org/2003/linkbase',
+        'xlink': 'http://www.w3.org/1999/xlink',
+        'xbrli': 'http://www.xbrl.org/2003/instance'
+    })
+
     def __init__(self):
         self.calc_relationships: Dict[str, List[CalculationRelationship]] = {}
         self.calculation_roles: Dict[str, str] = {}  # Role URI to description mapping
-        self.namespaces = {
-            'link': 'http://www.xbrl.org/2003/linkbase',
-            'xlink': 'http://www.w3.org/1999/xlink',
-            'xbrli': 'http://www.xbrl.org/2003/instance'
-        }
+        self.namespaces = dict(self._DEFAULT_NAMESPACES)
 
-    def load_calculation_linkbase(self, source: Union[str, etree._ElementTree]) -> None:
+    def reset(self) -> None:
+        """Forget all loaded relationships and roles, so the validator can be reused."""
+        self.calc_relationships.clear()
+        self.calculation_roles.clear()
+        self.namespaces.clear()
+        self.namespaces.update(self._DEFAULT_NAMESPACES)
+
+    def load_calculation_linkbase(self, source: Union[str, etree._ElementTree, etree._Element]) -> None:
         """
         Load calculation relationships from a calculation linkbase.
 
         Args:
-            source: Either a file path string or an already parsed etree._ElementTree
+            source: A file path string, an already parsed etree._ElementTree
+                or its root element
         """
         try:
-            # Get the root element whether from file or tree
             if isinstance(source, str):
-                tree = etree.parse(source)
-                root = tree.getroot()
+                self._stream_calculation_linkbase(source)
+                return
             elif isinstance(source, etree._ElementTree):
                 root = source.getroot()
+            elif isinstance(source, etree._Element):
+                root = source
             else:
                 raise ValueError(f"Unsupported source type: {type(source)}")
 
-            # First load roles if defined
-            for role_ref in root.findall('.//link:roleRef', self.namespaces):
-                role_uri = role_ref.get('roleURI')
-                if role_uri:
-                    self.calculation_roles[role_uri] = role_ref.get(f"{{{self.namespaces['xlink']}}}label", role_uri)
-
-            # Process each calculation link (grouped by role)
-            for calc_link in root.findall('.//link:calculationLink', self.namespaces):
-                role = calc_link.get(f"{{{self.namespaces['xlink']}}}role", "")
-
-                # Build locator map for this calculation group
-                locators = {}
-                for loc in calc_link.findall('link:loc', self.namespaces):
-                    label = loc.get(f"{{{self.namespaces['xlink']}}}label")
-                    href = loc.get(f"{{{self.namespaces['xlink']}}}href")
-                    if label and href:
-                        concept = self._extract_concept_from_href(href)
-                        locators[label] = concept
-
-                # Process calculation arcs
-                for arc in calc_link.findall('link:calculationArc', self.namespaces):
-                    try:
-                        weight = Decimal(arc.get('weight', '1.0'))
-                        order = int(arc.get('order', '1'))
-                        from_label = arc.get(f"{{{self.namespaces['xlink']}}}from")
-                        to_label = arc.get(f"{{{self.namespaces['xlink']}}}to")
-
-                        if from_label in locators and to_label in locators:
-                            parent = locators[from_label]
-                            child = locators[to_label]
-
-                            relationship = CalculationRelationship(
-                                parent=parent,
-                                child=child,
-                                weight=weight,
-                                order=order,
-                                role=role
-                            )
-
-                            if parent not in self.calc_relationships:
-                                self.calc_relationships[parent] = []
-                            self.calc_relationships[parent].append(relationship)
-
-                    except (ValueError, KeyError) as e:
-                        print(f"Warning: Error processing calculation arc: {e}")
+            # Clark-notation tags go straight to libxml2's tag matching,
+            # without ElementPath's prefix resolution. Roles are only read at
+            # validation time, so roleRefs and calculation links (grouped by
+            # role) can be handled in one walk over the tree, in document order
+            link_ns = self.namespaces['link']
+            role_ref_tag = f'{{{link_ns}}}roleRef'
+            for elem in root.iterdescendants(role_ref_tag, f'{{{link_ns}}}calculationLink'):
+                if elem.tag == role_ref_tag:
+                    self._process_role_ref(elem)
+                else:
+                    self._process_calculation_link(elem)
 
         except Exception as e:
             print(f"Error loading calculation linkbase: {e}")
             raise
 
+    def _stream_calculation_linkbase(self, path: str) -> None:
+        """Load a linkbase file with iterparse, holding one calculationLink at a time."""
+        link_ns = self.namespaces['link']
+        role_ref_tag = f'{{{link_ns}}}roleRef'
+        for _, elem in etree.iterparse(path, events=('end',),
+                                       tag=(role_ref_tag, f'{{{link_ns}}}calculationLink'),
+                                       **_LINKBASE_PARSER_OPTIONS):
+            if elem.tag == role_ref_tag:
+                self._process_role_ref(elem)
+            else:
+                self._process_calculation_link(elem)
+            elem.clear(keep_tail=True)
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+    def _process_role_ref(self, role_ref: etree.Element) -> None:
+        """Record the label of a roleRef element."""
+        role_uri = role_ref.get('roleURI')
+        if role_uri:
+            self.calculation_roles[role_uri] = role_ref.get(f"{{{self.namespaces['xlink']}}}label", role_uri)
+
+    def _process_calculation_link(self, calc_link: etree.Element) -> None:
+        """Add the relationships from the arcs of one calculationLink."""
+        link_ns = self.namespaces['link']
+        xlink_ns = self.namespaces['xlink']
+        label_attr = f'{{{xlink_ns}}}label'
+        href_attr = f'{{{xlink_ns}}}href'
+        from_attr = f'{{{xlink_ns}}}from'
+        to_attr = f'{{{xlink_ns}}}to'
+        role = calc_link.get(f'{{{xlink_ns}}}role', "")
+
+        # Build locator map for this calculation group
+        locators = {}
+        for loc in calc_link.iterchildren(f'{{{link_ns}}}loc'):
+            label = loc.get(label_attr)
+            href = loc.get(href_attr)
+            if label and href:
+                concept = self._extract_concept_from_href(href)
+                locators[label] = concept
+
+        # Process calculation arcs
+        for arc in calc_link.iterchildren(f'{{{link_ns}}}calculationArc'):
+            try:
+                weight = _weight(arc.get('weight', '1.0'))
+                order = int(arc.get('order', '1'))
+                from_label = arc.get(from_attr)
+                to_label = arc.get(to_attr)
+
+                if from_label in locators and to_label in locators:
+                    parent = locators[from_label]
+                    child = locators[to_label]
+
+                    relationship = CalculationRelationship(
+                        parent=parent,
+                        child=child,
+                        weight=weight,
+                        order=order,
+                        role=role
+                    )
+
+                    if parent not in self.calc_relationships:
+                        self.calc_relationships[parent] = []
+                    self.calc_relationships[parent].append(relationship)
+
+            except (ValueError, KeyError) as e:
+                print(f"Warning: Error processing calculation arc: {e}")
+
     def _extract_concept_from_href(self, href: str) -> str:
         """Extract concept name from href attribute."""
         if '#' in href:
             return href.split('#')[-1]
         return href
 
-    def validate_calculations(self, facts: Dict[str, Dict[str, Decimal]]) -> List[str]:
+    def validate_calculations(self, facts: Dict[str, Dict[str, Union[Decimal, int, float]]]) -> List[str]:
         """
         Validate calculation relationships across all contexts.
 
         Args:
-            facts: Dict mapping context_id to Dict of concept-value pairs
+            facts: Dict mapping context_id to Dict of concept-value pairs, with
+                values as Decimal, int or float
         """
         errors = []
+        arrays = self._compile()
 
         # Process each context separately
         for context_id, context_facts in facts.items():
-            context_errors = self.validate_context_calculations(context_facts, context_id)
+            context_errors = self.validate_context_calculations(context_facts, context_id, arrays)
             errors.extend(context_errors)
 
         return errors
 
-    def validate_context_calculations(self, facts: Dict[str, Decimal], context_id: str) -> List[str]:
+    def validate_context_calculations(self, facts: Dict[str, Decimal], context_id: str,
+                                      arrays: Optional['_CalculationArrays'] = None) -> List[str]:
         """Validate calculations for a single context."""
-        errors = []
-        processed = set()  # Track processed calculations to avoid cycles
-
-        for parent_concept, relationships in self.calc_relationships.items():
-            if parent_concept in facts and parent_concept not in processed:
-                # Sort relationships by order
-                sorted_rels = sorted(relationships, key=lambda r: r.order)
-
-                expected_sum = Decimal('0')
-                missing_children = []
-                used_children = set()
-
-                # Sum up all children according to their weights
-                for rel in sorted_rels:
-                    if rel.child in facts:
-                        child_value = facts[rel.child]
-                        expected_sum += child_value * rel.weight
-                        used_children.add(rel.child)
-                    else:
-                        missing_children.append(rel.child)
-
-                # Only validate if we have all required children
-                if not missing_children:
-                    parent_value = facts[parent_concept]
-                    # Allow for small rounding differences (configurable threshold)
-                    if abs(parent_value - expected_sum) > Decimal('0.01'):
-                        role_desc = self.calculation_roles.get(relationships[0].role, "default")
-                        errors.append(
-                            f"Calculation error in {parent_concept} (role: {role_desc}, context: {context_id}): "
-                            f"Expected {expected_sum}, got {parent_value}. "
-                            f"Children used: {', '.join(sorted(used_children))}"
-                        )
-                else:
-                    errors.append(
-                        f"Missing children for calculation of {parent_concept} "
-                        f"(context: {context_id}): {', '.join(missing_children)}"
-                    )
+        if arrays is None:
+            arrays = self._compile()
 
-                processed.add(parent_concept)
+        errors = []
+        for position in self._screen_context(facts, arrays):
+            parent_concept = arrays.parents[position]
+            error = self._check_parent(parent_concept, self.calc_relationships[parent_concept],
+                                       facts, context_id)
+            if error:
+                errors.append(error)
 
         return errors
 
+    def _compile(self) -> '_CalculationArrays':
+        """Flatten calc_relationships into arrays for vectorised screening."""
+        concept_ids: Dict[str, int] = {}
+        parent_ids, rel_parents, rel_children, rel_weights = [], [], [], []
+        offsets = [0]
+        for position, (parent, relationships) in enumerate(self.calc_relationships.items()):
+            parent_ids.append(concept_ids.setdefault(parent, len(concept_ids)))
+            offsets.append(offsets[-1] + len(relationships))
+            for rel in relationships:
+                rel_parents.append(position)
+                rel_children.append(concept_ids.setdefault(rel.child, len(concept_ids)))
+                rel_weights.append(float(rel.weight))
+
+        return _CalculationArrays(
+            parents=list(self.calc_relationships),
+            concepts=list(concept_ids),
+            parent_ids=np.array(parent_ids, dtype=np.intp),
+            offsets=np.array(offsets, dtype=np.intp),
+            rel_parents=np.array(rel_parents, dtype=np.intp),
+            rel_children=np.array(rel_children, dtype=np.intp),
+            weights=np.array(rel_weights, dtype=np.float64)
+        )
+
+    def _screen_context(self, facts: Dict[str, Decimal], arrays: '_CalculationArrays') -> List[int]:
+        """
+        Return the positions of parents in this context that need an exact check.
+
+        Weighted sums are computed in float64 first. A parent is only settled
+        here when its difference is inside the tolerance by more than float
+        rounding could account for; everything else, including parents with
+        missing children, goes through the exact Decimal check.
+        """
+        n_parents = len(arrays.parents)
+        parents_present = np.fromiter((parent in facts for parent in arrays.parents),
+                                      dtype=bool, count=n_parents)
+        concepts = arrays.concepts
+        try:
+            values = np.fromiter((facts.get(concept, 0) for concept in concepts),
+                                 dtype=np.float64, count=len(concepts))
+        except (TypeError, ValueError, ArithmeticError):
+            return np.flatnonzero(parents_present).tolist()
+
+        present = np.fromiter((concept in facts for concept in concepts), dtype=bool, count=len(concepts))
+        sums, magnitudes, n_missing = screen_sums(arrays.offsets, arrays.rel_parents, arrays.rel_children,
+                                                  arrays.weights, values, present)
+        n_rels = np.diff(arrays.offsets)
+
+        parent_values = values[arrays.parent_ids]
+        slack = (magnitudes + np.abs(parent_values)) * 1e-9
+        settled = (np.abs(parent_values - sums) + slack <= 0.01) & (n_missing == 0) & (n_rels > 0)
+
+        flagged = parents_present & ~settled
+        return np.flatnonzero(flagged).tolist()
+
+    def _check_parent(self, parent_concept: str, relationships: List[CalculationRelationship],
+                      facts: Dict[str, Union[Decimal, int, float]], context_id: str) -> Optional[str]:
+        """Check one parent exactly, returning its error message if it fails.
+
+        int and float values are converted through str(), so a float is taken
+        at its shortest repr (0.1, not its binary expansion).
+        """
+        # Sort relationships by order
+        sorted_rels = sorted(relationships, key=lambda r: r.order)
+
+        # Only validate if we have all required children; the Decimal sum is
+        # not needed to report missing ones
+        missing_children = [rel.child for rel in sorted_rels if rel.child not in facts]
+        if missing_children:
+            return (
+                f"Missing children for calculation of {parent_concept} "
+                f"(context: {context_id}): {', '.join(missing_children)}"
+            )
+
+        # Sum up all children according to their weights
+        expected_sum = Decimal('0')
+        for rel in sorted_rels:
+            expected_sum += _to_decimal(facts[rel.child]) * rel.weight
+
+        parent_value = _to_decimal(facts[parent_concept])
+        # Allow for small rounding differences (configurable threshold)
+        if abs(parent_value - expected_sum) > Decimal('0.01'):
+            role_desc = self.calculation_roles.get(relationships[0].role, "default")
+            used_children = {rel.child for rel in sorted_rels}
+            return (
+                f"Calculation error in {parent_concept} (role: {role_desc}, context: {context_id}): "
+                f"Expected {expected_sum}, got {parent_value}. "
+                f"Children used: {', '.join(sorted(used_children))}"
+            )
+        return None
+
     def get_calculation_network(self, role: Optional[str] = None) -> Dict[str, List[Tuple[str, Decimal]]]:
         """
         Get a hierarchical view of calculation relationships, optionally filtered by role.